@@ -11,6 +11,14 @@ import json
 import urllib.parse
 import locale
 import cairo
+import socket
+import struct
+import signal
+import stat
+import time
+import threading
+import queue
+import re
 
 # === 🌍 Sistema de Traducción ===
 try:
@@ -57,6 +65,190 @@ def _wrap_for_user(cmd_parts):
         return ["sudo", "-E", "-u", os.environ["SUDO_USER"]] + cmd_parts
     return cmd_parts
 
+# --- Launch helper ---
+# Con "launch": {"as_user": true} en la configuración, cuando el menú corre
+# como root bajo sudo, las apps se lanzan como el usuario
+# a través de un proceso auxiliar que ya corre como ese usuario (iniciado con
+# sudo una sola vez por sesión). El menú le manda un argv en JSON por un
+# socket UNIX privado; el auxiliar solo acepta peticiones de root o de su
+# propio uid (SO_PEERCRED) y anota cada lanzamiento en su log. Los
+# sudo_targets nunca pasan por el auxiliar: siguen usando sudo explícitamente.
+LAUNCH_HELPER_TIMEOUT = 2.0
+# Espera al auxiliar recién iniciado. Bloquea el hilo de GTK, pero solo en el
+# primer lanzamiento de la sesión y justo antes de que el menú se cierre
+LAUNCH_HELPER_START_TIMEOUT = 1.0
+LAUNCH_HELPER_LOG = "~/.cache/pymenu/launch-helper.log"
+SHELL_METACHARACTERS = set('|&;<>()$`*?[]{}~#\n')
+
+def _launch_helper_socket(uid):
+    """Socket path of the launch helper of `uid`, inside a 0700 directory"""
+    runtime = f"/run/user/{uid}"
+    base = runtime if os.path.isdir(runtime) else f"/tmp/pymenu-{uid}"
+    return os.path.join(base, "pymenu-launch.sock")
+
+def _command_parts(command):
+    """argv for a command line; shell syntax keeps going through sh -c"""
+    if SHELL_METACHARACTERS.intersection(command):
+        return ["sh", "-c", command]
+    try:
+        return shlex.split(command)
+    except ValueError:
+        return ["sh", "-c", command]
+
+def _helper_request(cmd_parts, uid):
+    """Send one launch to the helper; raises OSError when it is not there"""
+    path = _launch_helper_socket(uid)
+    # Solo se habla con un socket que pertenece al usuario destino
+    if os.stat(path).st_uid != uid:
+        raise PermissionError(f"{path} no pertenece al uid {uid}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(LAUNCH_HELPER_TIMEOUT)
+        client.connect(path)
+        client.sendall(json.dumps({"argv": cmd_parts}).encode() + b"\n")
+        reply = client.makefile('rb').readline()
+    if not reply:
+        raise ConnectionError("launch helper closed the connection")
+    return json.loads(reply)
+
+def _start_launch_helper(user, uid):
+    """Start the helper as the invoking user (the only sudo of the session)"""
+    subprocess.Popen(["sudo", "-E", "-u", user, sys.executable,
+                      os.path.abspath(__file__), "--launch-helper"],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    path = _launch_helper_socket(uid)
+    deadline = time.monotonic() + LAUNCH_HELPER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        # El archivo aparece en bind(), antes de listen(): esperar a que acepte
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                probe.connect(path)
+            return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+def launch_for_user(cmd_parts, as_user=False):
+    """
+    Launch cmd_parts. Without `as_user` (the default) it runs with the menu's
+    own uid. With it: direct spawn when the menu is not root; through the
+    launch helper when it is; sudo (_wrap_for_user) for sudo_targets or when
+    the helper cannot be reached.
+    """
+    if not cmd_parts:
+        return
+    if not as_user:
+        subprocess.Popen(cmd_parts,
+                         stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL,
+                         start_new_session=True)
+        return
+    user = os.environ.get("SUDO_USER")
+    # Sin SUDO_UID válido no hay socket del usuario que buscar: directo a sudo
+    sudo_uid = os.environ.get("SUDO_UID", "")
+    if (os.geteuid() == 0 and user and sudo_uid.isdigit() and int(sudo_uid) > 0
+            and cmd_parts[0] not in sudo_targets):
+        uid = int(sudo_uid)
+        for attempt in range(2):
+            try:
+                reply = _helper_request(cmd_parts, uid)
+            except (OSError, ValueError) as e:
+                if attempt == 0 and _start_launch_helper(user, uid):
+                    continue
+                print(f"⚠️ Launch helper no disponible ({e}), usando sudo")
+                break
+            if not reply.get("ok"):
+                print(f"❌ Launch helper: {reply.get('error')}")
+            return
+    subprocess.Popen(_wrap_for_user(cmd_parts),
+                     stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+
+def _display_alive():
+    """False once the X server of $DISPLAY is gone (end of the session)"""
+    display = os.environ.get("DISPLAY", "")
+    if not display.startswith(":"):
+        return True
+    number = display[1:].split(".")[0]
+    return os.path.exists(f"/tmp/.X11-unix/X{number}")
+
+def run_launch_helper():
+    """--launch-helper: serve launch requests from the menu as the current user"""
+    import pwd
+    uid = os.getuid()
+    os.environ["HOME"] = pwd.getpwuid(uid).pw_dir
+    path = _launch_helper_socket(uid)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid or stat.S_IMODE(info.st_mode) & 0o077:
+        print(f"Launch helper: {directory} no es un directorio privado del usuario")
+        return
+    # Un solo auxiliar por usuario: si el socket responde, ya hay uno
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            probe.connect(path)
+        return
+    except OSError:
+        # Socket viejo de un auxiliar que ya no corre: borrarlo antes de bind()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(8)
+    server.settimeout(60)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # los hijos se recogen solos
+    log_path = os.path.expanduser(LAUNCH_HELPER_LOG)
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    creds = struct.Struct("3i")
+    
+    with open(log_path, "a", buffering=1) as log:
+        log.write(f"{time.strftime('%F %T')} start uid={uid} socket={path}\n")
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if not _display_alive():
+                    break
+                continue
+            with conn:
+                conn.settimeout(LAUNCH_HELPER_TIMEOUT)
+                peer_pid, peer_uid, _ = creds.unpack(
+                    conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, creds.size))
+                if peer_uid not in (0, uid):
+                    log.write(f"{time.strftime('%F %T')} refused pid={peer_pid} uid={peer_uid}\n")
+                    continue
+                argv = None
+                try:
+                    request = json.loads(conn.makefile('rb').readline(65536))
+                    argv = request["argv"]
+                    if not argv or not all(isinstance(part, str) for part in argv):
+                        raise ValueError("argv must be a non-empty list of strings")
+                    child = subprocess.Popen(argv, stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.DEVNULL,
+                                             stderr=subprocess.DEVNULL,
+                                             start_new_session=True)
+                    reply = {"ok": True, "pid": child.pid}
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    reply = {"ok": False, "error": str(e)}
+                log.write(f"{time.strftime('%F %T')} pid={peer_pid} uid={peer_uid} "
+                          f"argv={json.dumps(argv)} {'ok' if reply['ok'] else reply['error']}\n")
+                try:
+                    conn.sendall(json.dumps(reply).encode() + b"\n")
+                except OSError:
+                    pass
+    server.close()
+    if os.path.exists(path):
+        os.unlink(path)
+
 def open_directory(path):
     """
     Intenta expandir la ruta y abrirla con el administrador predeterminado del sistema.
@@ -94,6 +286,224 @@ PROFILE_MANAGER = "/usr/local/essora-kit/ProfileManager.py"
 SHUTDOWN_CMD = "/usr/local/bin/logout_gui"
 CONFIG_FILE = "/usr/local/essora-kit/pymenu.json"
 
+
+class JobRunner:
+    """
+    Trabajos secundarios (índice de .desktop, búsqueda del .desktop de un
+    acceso directo) fuera del hilo de GTK: unos hilos daemon los ejecutan y el
+    callback de fin corre en el bucle principal. Cada trabajo tiene un tope de
+    tiempo; si se pasa, el callback recibe TimeoutError y el resultado tardío
+    se descarta. Versión reducida del JobRunner de pymenu-globicons.py (cada
+    script va suelto), sin métricas ni spawn().
+    """
+    WORKERS = 2
+    DEFAULT_TIMEOUT = 5.0
+    
+    def __init__(self, workers=WORKERS):
+        self.size = workers
+        self.jobs = queue.Queue()
+        self.workers = []
+    
+    def submit(self, kind, func, *args, on_done=None, timeout=DEFAULT_TIMEOUT):
+        """Run func(*args) in a worker; on_done(result, error) is called on the main loop"""
+        job = {'kind': kind, 'func': func, 'args': args, 'on_done': on_done,
+               'timeout': timeout, 'done': False, 'timer': None}
+        if on_done:
+            job['timer'] = GLib.timeout_add(int(timeout * 1000), self.on_timeout, job)
+        if len(self.workers) < self.size and self.jobs.unfinished_tasks >= len(self.workers):
+            worker = threading.Thread(target=self.work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        self.jobs.put(job)
+        return job
+    
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            result = error = None
+            try:
+                result = job['func'](*job['args'])
+            except Exception as e:
+                error = e
+            self.jobs.task_done()
+            GLib.idle_add(self.finish, job, result, error)
+    
+    def finish(self, job, result, error):
+        """Main loop: hand the result to the callback unless the job already timed out"""
+        if job['timer']:
+            GLib.source_remove(job['timer'])
+            job['timer'] = None
+        if not job['done']:
+            self.complete(job, result, error)
+        return False
+    
+    def on_timeout(self, job):
+        job['timer'] = None
+        if not job['done']:
+            self.complete(job, None, TimeoutError(f"{job['kind']} took more than {job['timeout']} s"))
+        return False
+    
+    def complete(self, job, result, error):
+        job['done'] = True
+        if job['on_done']:
+            try:
+                job['on_done'](result, error)
+            except Exception as e:
+                print(f"Error en el callback de {job['kind']}: {e}")
+
+
+# Índice inverso Exec -> .desktop guardado entre ejecuciones
+DESKTOP_EXEC_INDEX = os.path.expanduser("~/.cache/pymenu/essora-exec-index.json")
+
+
+class DesktopExecIndex:
+    """
+    Índice inverso de los .desktop: comando Exec normalizado -> id del
+    archivo, y nombre del programa -> id. Se guarda en JSON junto con las
+    fechas de modificación de los directorios y solo se reescanea cuando
+    alguna cambia, así buscar el .desktop de un comando es un diccionario.
+    Las búsquedas solo leen los mapas cargados; refresh() corre en el JobRunner.
+    """
+    VERSION = 1
+    FIELD_CODES = re.compile(r'\s*%[fFuUdDnNickvm]')
+    
+    def __init__(self, path=DESKTOP_EXEC_INDEX):
+        self.path = path
+        self.directories = [
+            '/usr/share/applications',
+            '/usr/local/share/applications',
+            os.path.expanduser('~/.local/share/applications'),
+        ]
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.by_exec = {}
+        self.by_program = {}
+        self.files = {}
+    
+    @classmethod
+    def normalize(cls, command):
+        """Exec line without field codes, whitespace collapsed, lowercase"""
+        return ' '.join(cls.FIELD_CODES.sub('', command or '').split()).lower()
+    
+    @staticmethod
+    def program(command):
+        """Basename of the program of an Exec line, skipping env and VAR=value"""
+        try:
+            parts = shlex.split(command or '')
+        except ValueError:
+            parts = (command or '').split()
+        for part in parts:
+            if part == 'env' or ('=' in part and not part.startswith('/')):
+                continue
+            return os.path.basename(part).lower()
+        return ''
+    
+    def current_stamp(self):
+        stamp = []
+        for directory in self.directories:
+            try:
+                stamp.append([directory, os.stat(directory).st_mtime_ns])
+            except OSError:
+                stamp.append([directory, None])
+        return stamp
+    
+    def refresh(self):
+        """Load the saved index, or rescan when a directory changed"""
+        with self.lock:
+            stamp = self.current_stamp()
+            if stamp == self.stamp:
+                return
+            if self.stamp is None and self.load(stamp):
+                return
+            self.scan()
+            self.stamp = stamp
+            self.save()
+    
+    def load(self, stamp):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('version') != self.VERSION or data.get('stamp') != stamp:
+            return False
+        self.by_exec = data['by_exec']
+        self.by_program = data['by_program']
+        self.files = data['files']
+        self.stamp = stamp
+        return True
+    
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'stamp': self.stamp, 'by_exec': self.by_exec,
+                           'by_program': self.by_program, 'files': self.files}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Error guardando el índice de .desktop: {e}")
+    
+    def scan(self):
+        by_exec, by_program, files = {}, {}, {}
+        for directory in self.directories:
+            try:
+                names = sorted(os.listdir(directory))
+            except OSError:
+                continue
+            for file_name in names:
+                if not file_name.endswith('.desktop') or file_name in files:
+                    continue
+                file_path = os.path.join(directory, file_name)
+                files[file_name] = file_path
+                command = self.exec_line(file_path)
+                if command:
+                    by_exec.setdefault(self.normalize(command), file_name)
+                    by_program.setdefault(self.program(command), file_name)
+        self.by_exec, self.by_program, self.files = by_exec, by_program, files
+    
+    @staticmethod
+    def exec_line(file_path):
+        """Exec= of the [Desktop Entry] group (stops at the next group)"""
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                in_entry = False
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('['):
+                        if in_entry:
+                            break
+                        in_entry = line == '[Desktop Entry]'
+                    elif in_entry and line.startswith('Exec='):
+                        return line[5:]
+        except OSError:
+            pass
+        return ''
+    
+    def lookup(self, exec_cmd):
+        """Desktop file id for a command line, or None"""
+        words = exec_cmd.split()
+        if words and words[0] == 'gtk-launch':
+            return self.desktop_id(words[1] if len(words) > 1 else '')
+        desktop_id = self.by_exec.get(self.normalize(exec_cmd))
+        # Por nombre de programa solo si el comando no lleva argumentos:
+        # "python3 foo.py" o "sh -c ..." no son el .desktop de python3 o sh
+        if not desktop_id and len(words) == 1:
+            desktop_id = self.by_program.get(self.program(exec_cmd))
+        return desktop_id
+    
+    def desktop_id(self, name):
+        """Id of an installed .desktop from a gtk-launch style name ('foo' or 'foo.desktop')"""
+        for candidate in (name, name + '.desktop'):
+            if candidate.endswith('.desktop') and candidate in self.files:
+                return candidate
+        return None
+    
+    def file_path(self, name):
+        desktop_id = self.desktop_id(name)
+        return self.files[desktop_id] if desktop_id else None
+
+
 class ConfigManager:
     """Manages reading and writing the application's JSON configuration."""
     def __init__(self, config_file=CONFIG_FILE):
@@ -157,6 +567,9 @@ class ConfigManager:
                 "tray": {
                 "use_tint2": False
             },
+            "launch": {
+                "as_user": False
+            },
             "categories": {
                 "excluded": []
             },
@@ -539,6 +952,7 @@ class JWMMenuParser:
 class ArcMenuLauncher(Gtk.Window):
     def __init__(self, icon_size=None, jwm_file=None, x=None, y=None):
         super().__init__(title="Pymenu")
+        self.set_name("pymenu")
         
         self.config_manager = ConfigManager()
         self.config = self.config_manager.config
@@ -547,6 +961,12 @@ class ArcMenuLauncher(Gtk.Window):
         self.icon_size = self.config['window'].get('icon_size', 32)
         
         self.parser = JWMMenuParser(jwm_file or "/usr/share/jwm/jwm/jwmrc")
+        self.jobs = JobRunner()
+        # Lanzar como SUDO_USER solo si se pide: por defecto se conserva el uid del menú
+        self.launch_as_user = self.config['launch'].get('as_user', False)
+        self.desktop_exec_index = DesktopExecIndex()
+        # Cargar (o construir) el índice de .desktop sin bloquear la ventana
+        self.jobs.submit('desktop-exec-index', self.desktop_exec_index.refresh, timeout=10)
         
         self.tray_config = self.parser.parse_tray_config()
         self.applications = self.parser.parse_jwm_menu()
@@ -569,6 +989,7 @@ class ArcMenuLauncher(Gtk.Window):
         self.pos_y = y
         
         self.context_menu_active = False   
+        self.css_provider = None
         
         screen = Gdk.Screen.get_default()
         visual = screen.get_rgba_visual()
@@ -594,7 +1015,7 @@ class ArcMenuLauncher(Gtk.Window):
         if use_gtk_theme:
             # Si usa tema GTK, usar un fondo sólido compatible
             css = """
-            GtkWindow, GtkEventBox {
+            #pymenu, .menu-window eventbox {
                 background-color: @theme_bg_color;
                 border-radius: 0px;
                 box-shadow: none;
@@ -614,13 +1035,13 @@ class ArcMenuLauncher(Gtk.Window):
             colors = self.config['colors']
             
             css = f"""
-            GtkWindow, GtkEventBox {{
+            #pymenu, .menu-window eventbox {{
                 background-color: {colors['background']};
                 border-radius: 0px;
                 box-shadow: none;
                 border: none;
             }}
-            .tooltip, tooltip, GtkTooltip {{
+            tooltip {{
                 background-color: {colors['background']};
                 color: {colors['text_normal']};
                 border-radius: 8px;
@@ -636,11 +1057,11 @@ class ArcMenuLauncher(Gtk.Window):
                 padding: 5px 10px 10px 10px;
             }}
         
-            listbox {{
+            .menu-window listbox {{
                 padding: 2px;
             }}
             
-            listbox row {{
+            .menu-window listbox row {{
                 background-color: {self.config['colors'].get('categories_background', 'rgba(0,0,0,0.4)')};
                 color: {self.config['colors']['text_normal']};
                 border-radius: 6px;
@@ -649,55 +1070,55 @@ class ArcMenuLauncher(Gtk.Window):
                 min-height: 26px;
             }}
         
-            listbox row:selected {{
+            .menu-window listbox row:selected {{
                 background-color: {colors['selected_background']};
                 color: {colors['selected_text']};
             }}
         
-            listbox row:hover {{
+            .menu-window listbox row:hover {{
                 background-color: {colors['hover_background']};
             }}
         
-            button {{
+            .menu-window button {{
                 border-radius: 8px;
                 padding: 2px 2px;
                 background-color: {colors['button_normal_background']};
                 color: {colors['button_text']};
                 border: none;
             }}
-            .action-button {{
+            .menu-window .action-button {{
                 border-radius: 6px;
                 background-color: {colors['button_normal_background']};
                 color: {colors['text_normal']};
                 border: 1px solid {colors['button_normal_background']};
             }}
-            .action-button:hover {{
+            .menu-window .action-button:hover {{
                 background-color: {colors['hover_background']};
             }}
             
-            listbox row.selected-category {{
+            .menu-window listbox row.selected-category {{
                 background-color: {colors['selected_background']};
                 color: {colors['selected_text']};
             }}
         
-            button:hover {{
+            .menu-window button:hover {{
                 background-color: {colors['hover_background']};
             }}       
-            .search-box:focus {{
+            .menu-window .search-box:focus {{
             background-color: {colors['button_normal_background']};
             color: {colors['text_normal']};
             border: 1px solid {colors['border']} ;
             border-radius: 8px;
             }}
-            .app-box {{
+            .menu-window .app-box {{
                 min-width: {self.icon_size + 0}px;
             }}
-            .category-list {{
+            .menu-window .category-list {{
                  background-color: {colors['categories_background']};
                  padding: 1px;
                  border-radius: 12px;
             }}
-            menuitem {{
+            .pymenu-context menuitem {{
                 background-color: {colors['background']};
                 color: {colors['text_normal']};
                 border-radius: 8px;
@@ -706,16 +1127,16 @@ class ArcMenuLauncher(Gtk.Window):
                 box-shadow: 0px 2px 5px rgba(0, 0, 0, 0.2);
             }}
             
-            menuitem:hover {{
+            .pymenu-context menuitem:hover {{
                 background-color: {colors['hover_background']};
                 color: {colors['text_normal']};
             }}
             
-            menuitem:selected {{
+            .pymenu-context menuitem:selected {{
                 background-color: {colors['hover_background']};
                 color: {colors['text_normal']};
             }}
-            button.profile-circular-style {{
+            .menu-window button.profile-circular-style {{
                 border-radius: 50%;
                 padding: 0; 
                 border: none;
@@ -723,20 +1144,23 @@ class ArcMenuLauncher(Gtk.Window):
                 min-height: 64px;
             }}
             
-            button.profile-circular-style:hover {{
+            .menu-window button.profile-circular-style:hover {{
                 background-color: rgba(255, 255, 255, 0.1);
                 box-shadow: none;
             }}            
             """
             print("Using custom colors")
         
-        style_provider = Gtk.CssProvider()
-        style_provider.load_from_data(css.encode('utf-8'))
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            style_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        # Un solo provider por lanzador: se registra en la pantalla una vez y
+        # en cada recarga solo se reemplaza su contenido (un único restyle)
+        if self.css_provider is None:
+            self.css_provider = Gtk.CssProvider()
+            Gtk.StyleContext.add_provider_for_screen(
+                Gdk.Screen.get_default(),
+                self.css_provider,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
+        self.css_provider.load_from_data(css.encode('utf-8'))
 
     def on_jwm_file_changed(self, monitor, file, other_file, event_type):
         """Reload the menu when the JWM file is modified"""
@@ -1425,17 +1849,10 @@ class ArcMenuLauncher(Gtk.Window):
                                 parts = cmd_clean.split()
                                 if len(parts) >= 2:
                                     app_name = parts[1]
-                                    desktop_paths = [
-                                        "/usr/share/applications/",
-                                        "/usr/local/share/applications/",
-                                        os.path.expanduser("~/.local/share/applications/")
-                                    ]
-                                    
-                                    for path in desktop_paths:
-                                        desktop_file = os.path.join(path, app_name + '.desktop')
-                                        if os.path.exists(desktop_file):
-                                            subprocess.Popen(["xdg-open", desktop_file])
-                                            return
+                                    desktop_file = self.desktop_exec_index.file_path(app_name)
+                                    if desktop_file:
+                                        launch_for_user(["xdg-open", desktop_file], self.launch_as_user)
+                                        return
                             
                             # Comando normal
                             import shlex
@@ -1444,9 +1861,7 @@ class ArcMenuLauncher(Gtk.Window):
                             except:
                                 cmd_parts = cmd_clean.split()
                             
-                            subprocess.Popen(cmd_parts,
-                                             stdout=subprocess.DEVNULL,
-                                             stderr=subprocess.DEVNULL)
+                            launch_for_user(cmd_parts, self.launch_as_user)
                         except Exception as e:
                             print(f"Error launching favorite {name}: {e}")
                     
@@ -2112,6 +2527,7 @@ class ArcMenuLauncher(Gtk.Window):
                 self.context_menu_active = True
                 
                 menu = Gtk.Menu()
+                menu.get_style_context().add_class('pymenu-context')
                 
                 # Opción ejecutar
                 item_run = Gtk.MenuItem(label=TR['Run'])
@@ -2397,9 +2813,7 @@ class ArcMenuLauncher(Gtk.Window):
         try:
             print(f"Launching browser search for: '{search_query}'")
             # Use xdg-open to launch the default browser
-            subprocess.Popen(["xdg-open", search_url], 
-                             stdout=subprocess.DEVNULL,
-                             stderr=subprocess.DEVNULL)
+            launch_for_user(["xdg-open", search_url], self.launch_as_user)
             # Close the menu after launching the browser
             Gtk.main_quit()
         except FileNotFoundError:
@@ -2423,22 +2837,12 @@ class ArcMenuLauncher(Gtk.Window):
                 parts = command.split()
                 if len(parts) >= 2:
                     app_name = parts[1]
-                    # Buscar archivo .desktop
-                    desktop_paths = [
-                        "/usr/share/applications/",
-                        "/usr/local/share/applications/",
-                        os.path.expanduser("~/.local/share/applications/")
-                    ]
-                    
-                    for path in desktop_paths:
-                        for ext in ['', '.desktop']:
-                            desktop_file = os.path.join(path, app_name + ext)
-                            if os.path.exists(desktop_file):
-                                # Usar xdg-open
-                                subprocess.Popen(["xdg-open", desktop_file],
-                                               stdout=subprocess.DEVNULL,
-                                               stderr=subprocess.DEVNULL)
-                                return
+                    # Buscar archivo .desktop en el índice
+                    desktop_file = self.desktop_exec_index.file_path(app_name)
+                    if desktop_file:
+                        # Usar xdg-open
+                        launch_for_user(["xdg-open", desktop_file], self.launch_as_user)
+                        return
                     
                     # Si no encuentra .desktop, buscar el ejecutable
                     print(f"⚠️ No se encontró .desktop para: {app_name}")
@@ -2456,11 +2860,7 @@ class ArcMenuLauncher(Gtk.Window):
             
             # 🚀 EJECUCIÓN NORMAL
             print(f"▶️ Ejecutando: {command}")
-            subprocess.Popen(command, 
-                            shell=True,
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            start_new_session=True)
+            launch_for_user(_command_parts(command), self.launch_as_user)
             
         except Exception as e:
             print(f"❌ Error lanzando {name}: {e}")   
@@ -2543,9 +2943,18 @@ class ArcMenuLauncher(Gtk.Window):
                 print("❌ No se pudo extraer comando")
                 return
             
-            app_name = os.path.basename(parts[0])
-            desktop_id = self._find_desktop_file(exec_cmd)
+            # La búsqueda del .desktop original lee archivos: va a un hilo y
+            # el acceso se escribe al terminar (o sin URL= si tarda demasiado)
+            self.jobs.submit('find-desktop-file', self._find_desktop_file, exec_cmd, timeout=3,
+                             on_done=lambda desktop_id, error: self._write_desktop_shortcut(
+                                 app_info, desktop_dir, exec_cmd, None if error else desktop_id))
             
+        except Exception as e:
+            print(f"❌ Error creando acceso directo: {e}")
+    
+    def _write_desktop_shortcut(self, app_info, desktop_dir, exec_cmd, desktop_id):
+        """Write the shortcut: a Type=Link to the original .desktop, or a plain launcher"""
+        try:
             # 3. Crear archivo .desktop con URL= o como fallback
             shortcut_name = app_info.get('Name', 'Aplicación').replace('/', '_').replace(' ', '_')
             desktop_file_path = os.path.join(desktop_dir, f"{shortcut_name}.desktop")
@@ -2555,7 +2964,7 @@ class ArcMenuLauncher(Gtk.Window):
                 desktop_content = f"""[Desktop Entry]
 Version=1.0
 Type=Link
-URL=/usr/share/applications/{desktop_id}
+URL={self.desktop_exec_index.files.get(desktop_id, '/usr/share/applications/' + desktop_id)}
 Icon={app_info.get('Icon', 'application-x-executable')}
 Name={shortcut_name}
 Comment=Acceso directo a {shortcut_name}
@@ -2593,38 +3002,16 @@ Categories=Application;
             print(f"❌ Error creando acceso directo: {e}")
             
     def _find_desktop_file(self, exec_cmd):
-        """Busca el archivo .desktop original (SOLO LECTURA)"""
-        search_paths = [
-            '/usr/share/applications',
-            '/usr/local/share/applications',
-            os.path.expanduser('~/.local/share/applications'),
-        ]
-        
-        for search_path in search_paths:
-            if not os.path.exists(search_path):
-                continue
-            
-            try:
-                for file_name in os.listdir(search_path):
-                    if not file_name.endswith('.desktop'):
-                        continue
-                        
-                    file_path = os.path.join(search_path, file_name)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if exec_cmd.lower() in content.lower():
-                                return file_name
-                    except:
-                        continue
-                        
-            except PermissionError:
-                continue
-        
-        return None
+        """Busca el archivo .desktop original en el índice inverso (SOLO LECTURA).
+        Corre en el JobRunner, así que puede reescanear si algo cambió."""
+        self.desktop_exec_index.refresh()
+        return self.desktop_exec_index.lookup(exec_cmd)
             
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--launch-helper':
+        run_launch_helper()
+        return
+    
     icon_size = None
     jwm_file = None
     x = None
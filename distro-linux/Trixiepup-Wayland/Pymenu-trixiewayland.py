@@ -370,6 +370,7 @@ class OpenboxMenuParser:
 class ArcMenuLauncher(Gtk.Window):
     def __init__(self, icon_size=None, jwm_file=None, x=None, y=None):
         super().__init__(title="PyMenuPup")
+        self.set_name("pymenu")
         self.set_wmclass("pymenu", "PyMenuPup")
         self.config_manager = ConfigManager()
         self.config = self.config_manager.config
@@ -393,6 +394,7 @@ class ArcMenuLauncher(Gtk.Window):
         self.hovered_category = None
         self.selected_category_row = None
         self.context_menu_active = False
+        self.css_provider = None
         
         self.pos_x = x
         self.pos_y = y
@@ -465,7 +467,7 @@ class ArcMenuLauncher(Gtk.Window):
             if use_gtk_theme:
                 # Si usa tema GTK, usar colores del tema del sistema
                 css = """
-                GtkWindow, GtkEventBox {
+                #pymenu, .menu-window eventbox {
                     background-color: @theme_bg_color;
                     border-radius: 0px;
                     box-shadow: none;
@@ -485,13 +487,13 @@ class ArcMenuLauncher(Gtk.Window):
                 colors = self.config['colors']
                 
                 css = f"""
-                GtkWindow, GtkEventBox {{
+                #pymenu, .menu-window eventbox {{
                     background-color: {colors['background']};
                     border-radius: 0px;
                     box-shadow: none;
                     border: none;
                 }}
-                .tooltip, tooltip, GtkTooltip {{
+                tooltip {{
                     background-color: {colors['background']};
                     color: {colors['text_normal']};
                     border-radius: 8px;
@@ -507,11 +509,11 @@ class ArcMenuLauncher(Gtk.Window):
                     padding: 5px 10px 10px 10px;
                 }}
             
-                listbox {{
+                .menu-window listbox {{
                     padding: 2px;
                 }}
                 
-                listbox row {{
+                .menu-window listbox row {{
                     background-color: {self.config['colors'].get('categories_background', 'rgba(0,0,0,0.4)')};
                     color: {self.config['colors']['text_normal']};
                     border-radius: 6px;
@@ -520,55 +522,55 @@ class ArcMenuLauncher(Gtk.Window):
                     min-height: 26px;
                 }}
             
-                listbox row:selected {{
+                .menu-window listbox row:selected {{
                     background-color: {colors['selected_background']};
                     color: {colors['selected_text']};
                 }}
             
-                listbox row:hover {{
+                .menu-window listbox row:hover {{
                     background-color: {colors['hover_background']};
                 }}
             
-                button {{
+                .menu-window button {{
                     border-radius: 8px;
                     padding: 2px 2px;
                     background-color: {colors['button_normal_background']};
                     color: {colors['button_text']};
                     border: none;
                 }}
-                .action-button {{
+                .menu-window .action-button {{
                     border-radius: 6px;
                     background-color: {colors['button_normal_background']};
                     color: {colors['text_normal']};
                     border: 1px solid {colors['button_normal_background']};
                 }}
-                .action-button:hover {{
+                .menu-window .action-button:hover {{
                     background-color: {colors['hover_background']};
                 }}
                 
-                listbox row.selected-category {{
+                .menu-window listbox row.selected-category {{
                     background-color: {colors['selected_background']};
                     color: {colors['selected_text']};
                 }}
             
-                button:hover {{
+                .menu-window button:hover {{
                     background-color: {colors['hover_background']};
                 }}       
-                .search-box:focus {{
+                .menu-window .search-box:focus {{
                 background-color: {colors['button_normal_background']};
                 color: {colors['text_normal']};
                 border: 1px solid {colors['border']} ;
                 border-radius: 8px;
                 }}
-                .app-box {{
+                .menu-window .app-box {{
                     min-width: {self.icon_size + 0}px;
                 }}
-                .category-list {{
+                .menu-window .category-list {{
                      background-color: {colors['categories_background']};
                      padding: 1px;
                      border-radius: 12px;
                 }}
-                menuitem {{
+                .pymenu-context menuitem {{
                     background-color: {colors['background']};
                     color: {colors['text_normal']};
                     border-radius: 8px;
@@ -577,39 +579,39 @@ class ArcMenuLauncher(Gtk.Window):
                     box-shadow: 0px 2px 5px rgba(0, 0, 0, 0.2);
                 }}
                 
-                menuitem:hover {{
+                .pymenu-context menuitem:hover {{
                     background-color: {colors['hover_background']};
                     color: {colors['text_normal']};
                 }}
                 
-                menuitem:selected {{
+                .pymenu-context menuitem:selected {{
                     background-color: {colors['hover_background']};
                     color: {colors['text_normal']};
                 }}
-                .quick-access-button {{
+                .menu-window .quick-access-button {{
                     padding: 5px;
                     margin: 2px;
                 }}
-                .quick-access-button:hover {{
+                .menu-window .quick-access-button:hover {{
                     background-color: {colors['hover_background']};
                 }}
-                #quick-access-icon {{
+                .menu-window #quick-access-icon {{
                     font-size: 18pt;
                 }}
-                .social-button {{
+                .menu-window .social-button {{
                     padding: 5px;
                     margin: 2px;
                     border-radius: 8px;
                     background-color: {colors['button_normal_background']};
                 }}
-                .social-button:hover {{
+                .menu-window .social-button:hover {{
                     background-color: {colors['hover_background']};
                 }}
-                #social-icon {{
+                .menu-window #social-icon {{
                     font-size: 16pt;
                     color: {colors['text_normal']};
                 }}
-                button.profile-circular-style {{
+                .menu-window button.profile-circular-style {{
                     border-radius: 50%;
                     padding: 0; 
                     border: none;
@@ -617,20 +619,23 @@ class ArcMenuLauncher(Gtk.Window):
                     min-height: 64px;
                 }}
                 
-                button.profile-circular-style:hover {{
+                .menu-window button.profile-circular-style:hover {{
                     background-color: rgba(255, 255, 255, 0.1);
                     box-shadow: none;
                 }}            
                 """
                 print("Using custom colors")
             
-            style_provider = Gtk.CssProvider()
-            style_provider.load_from_data(css.encode('utf-8'))
-            Gtk.StyleContext.add_provider_for_screen(
-                Gdk.Screen.get_default(),
-                style_provider,
-                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-            )
+            # Un solo provider por lanzador: se registra en la pantalla una vez y
+            # en cada recarga solo se reemplaza su contenido (un único restyle)
+            if self.css_provider is None:
+                self.css_provider = Gtk.CssProvider()
+                Gtk.StyleContext.add_provider_for_screen(
+                    Gdk.Screen.get_default(),
+                    self.css_provider,
+                    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+                )
+            self.css_provider.load_from_data(css.encode('utf-8'))
 
     def on_jwm_file_changed(self, monitor, file, other_file, event_type):
         if event_type == Gio.FileMonitorEvent.CHANGES_DONE_HINT:
@@ -1215,6 +1220,7 @@ class ArcMenuLauncher(Gtk.Window):
         if event.button == 3:
             self.context_menu_active = True
             menu = Gtk.Menu()
+            menu.get_style_context().add_class('pymenu-context')
             
             i_run = Gtk.MenuItem(label=TR['Run'])
             i_run.connect("activate", lambda w: self.on_app_clicked(button, app_info))
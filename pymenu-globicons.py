@@ -12,6 +12,18 @@ import json
 import urllib.parse
 import locale
 import warnings
+import time
+import math
+import re
+import heapq
+import bisect
+import unicodedata
+import threading
+import socket
+import queue
+import struct
+import glob
+from collections import deque
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
 # === 🌍 Sistema de Traducción ===
@@ -41,6 +53,211 @@ from gi.repository import Pango
 
 CONFIG_FILE = "/root/.config/pymenu.json"
 
+# Cachés regenerables (índice de .desktop, etc.)
+CACHE_DIR = os.path.expanduser("~/.cache/pymenu")
+
+DESKTOP_DIRS = [
+    "/usr/share/applications",
+    "/usr/local/share/applications",
+    os.path.expanduser("~/.local/share/applications"),
+]
+# Tope (s) del escaneo de los .desktop en segundo plano; un resultado tardío se descarta
+DESKTOP_SCAN_TIMEOUT = 30
+
+# Historial de lanzamientos (log de solo-anexar) para la frecencia
+HISTORY_FILE = os.path.expanduser("~/.local/share/pymenu/launches.log")
+# Tiempo desde el clic hasta el spawn de cada lanzamiento (ms), para seguirlo
+LAUNCH_TIMES_FILE = os.path.join(CACHE_DIR, "launch-times.log")
+LAUNCH_TIMES_MAX_BYTES = 64 * 1024
+
+# Bono máximo de frecencia en la búsqueda y apps en la categoría "Frequent"
+FRECENCY_MAX_BONUS = 12
+FREQUENT_LIMIT = 12
+
+# Presupuesto de tiempo por tramo del precargado de categorías en reposo
+PREBUILD_SLICE_MS = 8
+
+# Lectura anticipada de ejecutables y bibliotecas (arranques en frío desde un
+# SFS): apps más frecuentes calentadas al abrir y tope de lectura por segundo
+PREFETCH_TOP_APPS = 3
+PREFETCH_RATE_MB = 16
+
+# Búsqueda: objetivo de latencia desde la primera tecla de una ráfaga, debounce
+# mínimo y cuántos resultados se construyen antes de mostrar la vista
+SEARCH_LATENCY_MS = 120
+SEARCH_DEBOUNCE_MIN_MS = 15
+SEARCH_TOP_RESULTS = 30
+# Solo los mejores N resultados de la búsqueda difusa llegan a mostrarse
+SEARCH_MAX_RESULTS = 100
+
+# Proveedores extra de búsqueda (lugares, recientes, comandos...): plazo por
+# tecla para mostrar juntos sus resultados, tope de ejecución y de resultados
+SEARCH_PROVIDER_DEADLINE_MS = 150
+SEARCH_PROVIDER_TIMEOUT_MS = 2000
+SEARCH_PROVIDER_LIMIT = 6
+# Documentos mostrados al pulsar "Recent" en Places
+RECENT_FILES_SHOWN = 40
+
+# PYMENU_PROFILE=1 imprime tiempos de cambio de categoría, búsqueda, etc.
+PROFILE = os.environ.get('PYMENU_PROFILE', '') not in ('', '0')
+
+
+def profile_log(label, start):
+    """Print elapsed milliseconds since `start` (time.monotonic) when profiling is on"""
+    if PROFILE:
+        print(f"⏱️ {label}: {(time.monotonic() - start) * 1000:.1f} ms")
+
+
+def strip_accents(text):
+    """Decompose with NFKD and drop combining marks ('Música' -> 'Musica')"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    if decomposed.isascii():
+        return decomposed
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normalize_search_text(text):
+    """Search key: accents stripped, casefolded, whitespace collapsed"""
+    return ' '.join(strip_accents(str(text or '').casefold()).split())
+
+
+def app_identity(app_info):
+    """Stable identity of an app for the launch history: its Exec line"""
+    return ' '.join(app_info.get('Exec', '').split())
+
+
+def terminal_command(path_index=None):
+    """Terminal emulator for Terminal=true entries"""
+    if path_index is None:
+        import shutil
+        which = shutil.which
+    else:
+        which = path_index.which
+    for terminal in ('defaultterminal', 'urxvt', 'lxterminal', 'xterm'):
+        if which(terminal):
+            return terminal
+    return 'xterm'
+
+
+# Lo que solo entiende /bin/sh: tuberías, redirecciones, variables, comodines,
+# ~, subshells y asignaciones VAR=valor delante del comando
+SHELL_METACHARACTERS = re.compile(r'[|&;<>()$`*?\[\]{}~#\n]|^\s*[A-Za-z_]\w*=')
+
+
+def command_argv(command):
+    """
+    Tokenize a command line for a direct spawn. Returns None when it needs
+    the shell (metacharacters or unbalanced quotes); those run with sh -c.
+    """
+    if not command or SHELL_METACHARACTERS.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    return argv or None
+
+
+# Una ruta dentro del comando; si es un directorio se abre en vez de ejecutar
+COMMAND_PATH = re.compile(r"(/[^\s']+)")
+DESKTOP_FIELD_CODES = re.compile(r'\s+%\w+')
+
+
+def record_launch_time(label, elapsed_ms):
+    """Append one launch-to-spawn measurement to LAUNCH_TIMES_FILE"""
+    try:
+        os.makedirs(os.path.dirname(LAUNCH_TIMES_FILE), exist_ok=True)
+        with open(LAUNCH_TIMES_FILE, 'a+') as f:
+            f.write(f"{time.time():.0f}\t{elapsed_ms:.1f}\t{label}\n")
+            size = f.tell()
+            if size > LAUNCH_TIMES_MAX_BYTES:
+                # Conservar la mitad más reciente
+                f.seek(size // 2)
+                f.readline()
+                tail = f.read()
+        if size > LAUNCH_TIMES_MAX_BYTES:
+            with open(LAUNCH_TIMES_FILE, 'w') as f:
+                f.write(tail)
+    except OSError as e:
+        print(f"Error guardando tiempo de lanzamiento: {e}")
+
+
+def launch_plan(app_info, desktop_entries=None):
+    """
+    Decide once how an app is launched: folder to open, or command line,
+    argv (None = needs sh -c), terminal flag and working directory.
+    Pure function (no GTK) so it can run at parse time.
+    """
+    command = app_info.get('Exec', '')
+    plan = {'command': '', 'argv': None, 'directory': None, 'terminal': False, 'cwd': None}
+    if not command:
+        return plan
+    
+    # --- CORRECCIÓN DINÁMICA DE CARPETAS ---
+    path_match = COMMAND_PATH.search(command)
+    if path_match:
+        potential_path = os.path.expanduser(path_match.group(1))
+        if os.path.isdir(potential_path):
+            plan['directory'] = potential_path
+            return plan
+    
+    # gtk-launch: una búsqueda en la base de .desktop
+    if command.startswith('gtk-launch '):
+        desktop_name = command.replace('gtk-launch ', '').strip()
+        entry = desktop_entries.lookup(desktop_name) if desktop_entries else None
+        if entry and entry['exec_line']:
+            command = entry['exec_line']
+            if entry['path'] and os.path.isdir(entry['path']):
+                plan['cwd'] = entry['path']
+            plan['terminal'] = bool(entry['terminal'])
+    
+    # Limpiar el comando de parámetros .desktop
+    command = DESKTOP_FIELD_CODES.sub('', command).strip()
+    plan['command'] = command
+    plan['argv'] = command_argv(command)
+    return plan
+
+
+def spawn_command(command, argv=None, cwd=None, path_index=None, reap=True):
+    """
+    Launch a command detached from the menu, without an intermediate /bin/sh
+    when possible (os.posix_spawn). Shell syntax and shell builtins fall back
+    to sh -c. Returns the pid.
+    """
+    started = time.monotonic()
+    if argv is None:
+        argv = command_argv(command)
+    executable = None
+    if argv:
+        if path_index is not None:
+            executable = path_index.which(argv[0])
+        else:
+            import shutil
+            executable = shutil.which(argv[0])
+
+    if not executable:
+        mode = 'shell'
+        pid = subprocess.Popen(command, shell=True, cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True).pid
+    elif cwd or not hasattr(os, 'posix_spawn'):
+        # posix_spawn no puede cambiar de directorio
+        mode = 'exec'
+        pid = subprocess.Popen(argv, executable=executable, cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True).pid
+    else:
+        mode = 'posix_spawn'
+        pid = os.posix_spawn(executable, argv, os.environ, setsid=True, file_actions=[
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+        ])
+        if reap:
+            # GLib recoge al hijo cuando termina, así no queda zombi
+            GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, lambda *args: None)
+    profile_log(f"Spawn via {mode}: {command}", started)
+    return pid
+
 
 def open_directory(path):
     """
@@ -145,7 +362,21 @@ class ConfigManager:
                 "use_xfce": False
             },
             "categories": {
-                "excluded": []
+                "excluded": [],
+                "show_frequent": False
+            },
+            "search_providers": {
+                "places": True,
+                "favorites": True,
+                "recent": True,
+                "commands": True
+            },
+            "hover": {
+                "aim_delay_ms": 300,
+                "rest_delay_ms": 40,
+                "sweep_speed": 0.8,
+                "prefetch_apps": True,
+                "prefetch_delay_ms": 150
             },
             "favorites": [],
             "places": {
@@ -283,6 +514,11 @@ class JWMMenuParser:
         self.applications = {}
         self.icon_paths = []
         self.tray_config = None
+        self.search_index = AppSearchIndex({})
+        self.desktop_entries = None
+        # Sin caché válida de .desktop el índice se arma sin palabras clave
+        # y quien use el parser las agrega después con DesktopEntryIndex.load()
+        self.desktop_entries_stale = True
         
     def parse_tray_config(self):
         """Parse tint2, XFCE, LXDE or JWM config based on user preference to get tray position and size"""
@@ -527,11 +763,38 @@ class JWMMenuParser:
                 applications['System'] = applications.get('System', []) + root_programs
                            
             
-            return applications if applications else self.get_fallback_applications()
+            return self.index_applications(applications if applications else self.get_fallback_applications())
             
         except Exception as e:
             print(f"Error parsing JWM menu: {e}")
-            return self.get_fallback_applications()
+            return self.index_applications(self.get_fallback_applications())
+    
+    def index_applications(self, applications):
+        """Build the search index that goes with the parsed applications"""
+        # Solo la caché: escanear los .desktop retrasaría la primera ventana
+        cached = DesktopEntryIndex.cached()
+        self.desktop_entries_stale = cached is None
+        self.desktop_entries = cached or self.desktop_entries
+        self.apply_desktop_entries(applications)
+        return applications
+    
+    def apply_desktop_entries(self, applications):
+        """Rebuild what depends on self.desktop_entries: search keywords and launch plans.
+        Entry ids don't change while the applications are the same."""
+        start = time.monotonic()
+        self.search_index = AppSearchIndex(applications, self.desktop_entries)
+        profile_log(f"Search index ({len(self.search_index)} entries)", start)
+        self.plan_launches(applications)
+    
+    def plan_launches(self, applications):
+        """Attach a launch plan to every app, so a click only runs it"""
+        start = time.monotonic()
+        count = 0
+        for apps in applications.values():
+            for app in apps:
+                app['Launch'] = launch_plan(app, self.desktop_entries)
+                count += 1
+        profile_log(f"Launch plans ({count} apps)", start)
             
     def parse_xfce_panel_config(self):
         """Parse XFCE panel configuration - supports multiple panels"""
@@ -769,10 +1032,1460 @@ class JWMMenuParser:
             ]
         } 
 
-        
+
+class DesktopEntryIndex:
+    """
+    Índice de los .desktop del sistema: texto para la búsqueda (GenericName,
+    Keywords, Name traducido) y los datos para lanzar (Exec ya limpio,
+    Terminal, Path, TryExec, Icon). Se guarda en CACHE_DIR y solo se regenera
+    si cambia la fecha de modificación de algún directorio de DESKTOP_DIRS o
+    el idioma; ni la búsqueda ni gtk-launch leen un .desktop.
+    """
+    CACHE_FILE = os.path.join(CACHE_DIR, "desktop-entries.json")
+    VERSION = 2
+    FIELDS = ('Name', 'GenericName', 'Keywords')
+    LAUNCH_KEYS = {'Terminal': 'terminal', 'Path': 'path', 'TryExec': 'try_exec', 'Icon': 'icon'}
+    # Códigos de campo de Exec (%f, %U, ...) que no aplican al lanzar sin archivos
+    FIELD_CODES = re.compile(r'\s*%[fFuUdDnNickvm]')
+    # Intérpretes y lanzadores: su Exec no identifica a una aplicación concreta
+    WRAPPERS = re.compile(r'(?:python[0-9.]*|sh|bash|dash|env|xdg-open|rox|gtk-launch)$')
+    
+    def __init__(self, entries):
+        # entries: {id: {'exec': basename, 'text': campos unidos,
+        #                'exec_line', 'terminal', 'path', 'try_exec', 'icon'}}
+        self.entries = entries
+        # Exec completo normalizado -> entrada; nunca por nombre de programa
+        self.by_exec = {}
+        for entry in entries.values():
+            if entry['exec'] and not self.WRAPPERS.match(entry['exec']):
+                self.by_exec.setdefault(self.normalize_exec(entry['exec_line']), entry)
+    
+    @staticmethod
+    def languages():
+        """Locale keys to accept for Name[xx] etc.: 'es_AR' -> ['es_AR', 'es']"""
+        lang = os.environ.get('LC_ALL') or os.environ.get('LC_MESSAGES') or os.environ.get('LANG', '')
+        lang = lang.split('.')[0].split('@')[0]
+        if not lang or lang in ('C', 'POSIX'):
+            return []
+        return [lang, lang.split('_')[0]] if '_' in lang else [lang]
+    
+    @staticmethod
+    def dir_mtimes():
+        mtimes = {}
+        for directory in DESKTOP_DIRS:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime
+            except OSError:
+                mtimes[directory] = None
+        return mtimes
+    
+    @classmethod
+    def cached(cls):
+        """Index from the cache, or None if it is missing or the directories or the language changed"""
+        start = time.monotonic()
+        try:
+            with open(cls.CACHE_FILE, 'r') as f:
+                cache = json.load(f)
+            if (cache.get('version') == cls.VERSION and cache.get('mtimes') == cls.dir_mtimes()
+                    and cache.get('languages') == cls.languages()):
+                index = cls(cache['entries'])
+                profile_log(f"Desktop entries from cache ({len(index.entries)})", start)
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+    
+    @classmethod
+    def load(cls, force=False):
+        """Index from the cache, rebuilt if the directories or the language changed.
+        A rebuild reads every .desktop file: run it outside the GTK thread."""
+        index = None if force else cls.cached()
+        if index:
+            return index
+        start = time.monotonic()
+        mtimes = cls.dir_mtimes()
+        languages = cls.languages()
+        index = cls(cls.scan(languages))
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = cls.CACHE_FILE + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': cls.VERSION, 'mtimes': mtimes,
+                           'languages': languages, 'entries': index.entries}, f)
+            os.replace(tmp_path, cls.CACHE_FILE)
+        except OSError as e:
+            print(f"Error guardando caché de .desktop: {e}")
+        profile_log(f"Desktop entries scanned ({len(index.entries)})", start)
+        return index
+    
+    @classmethod
+    def scan(cls, languages):
+        """Read every .desktop file; later directories override earlier ones"""
+        entries = {}
+        for directory in DESKTOP_DIRS:
+            try:
+                names = [n for n in os.listdir(directory) if n.endswith('.desktop')]
+            except OSError:
+                continue
+            for file_name in names:
+                entry = cls.parse_file(os.path.join(directory, file_name), languages)
+                if entry:
+                    entries[file_name[:-len('.desktop')]] = entry
+        return entries
+    
+    @classmethod
+    def parse_file(cls, path, languages):
+        """Exec basename and searchable text of the [Desktop Entry] group"""
+        values = []
+        exec_line = ''
+        launch = {'terminal': False, 'path': '', 'try_exec': '', 'icon': ''}
+        in_entry = False
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('['):
+                        in_entry = line == '[Desktop Entry]'
+                        continue
+                    if not in_entry or '=' not in line:
+                        continue
+                    key, value = line.split('=', 1)
+                    key = key.strip()
+                    field, _, locale_key = key.partition('[')
+                    locale_key = locale_key.rstrip(']')
+                    if key == 'Exec':
+                        exec_line = value.strip()
+                    elif key in cls.LAUNCH_KEYS:
+                        value = value.strip()
+                        launch[cls.LAUNCH_KEYS[key]] = value.lower() == 'true' if key == 'Terminal' else value
+                    elif field in cls.FIELDS and (not locale_key or locale_key in languages):
+                        values.append(value.replace(';', ' ').strip())
+        except OSError:
+            return None
+        entry = {'exec': cls.exec_basename(exec_line), 'text': ' '.join(values),
+                 'exec_line': cls.FIELD_CODES.sub('', exec_line).replace('%%', '%').strip()}
+        entry.update(launch)
+        return entry
+    
+    def lookup(self, desktop_id):
+        """Entry for 'foo' or 'foo.desktop', or None"""
+        if desktop_id.endswith('.desktop'):
+            desktop_id = desktop_id[:-len('.desktop')]
+        return self.entries.get(desktop_id)
+    
+    @staticmethod
+    def exec_basename(command):
+        """Program of an Exec line, skipping 'env VAR=value' prefixes"""
+        parts = command.split()
+        if parts and parts[0] == 'env':
+            parts = [p for p in parts[1:] if '=' not in p]
+        return os.path.basename(parts[0]) if parts else ''
+    
+    @classmethod
+    def normalize_exec(cls, command):
+        """Exec line without field codes and with whitespace collapsed"""
+        return ' '.join(cls.FIELD_CODES.sub('', command).replace('%%', '%').split())
+    
+    def keywords_for(self, app):
+        """Desktop-entry text for a menu entry, joined by gtk-launch id or by the whole Exec line"""
+        parts = app.get('Exec', '').split()
+        if not parts:
+            return ''
+        if parts[0] == 'gtk-launch':
+            entry = self.lookup(parts[1]) if len(parts) == 2 else None
+        else:
+            entry = self.by_exec.get(self.normalize_exec(' '.join(parts)))
+        return entry['text'] if entry else ''
+
+
+class AppSearchIndex:
+    """
+    Índice de búsqueda construido junto con el parseo del menú.
+    Guarda en listas planas los textos ya normalizados (nombre, comentario,
+    ejecutable y categoría); cada campo se filtra con una regex sobre todas
+    las entradas unidas en una sola cadena. rank() hace además una búsqueda
+    difusa ("lbo" -> LibreOffice) ordenada por puntuación.
+    """
+    # Consultas más cortas solo buscan coincidencias contiguas
+    FUZZY_MIN_LENGTH = 3
+    
+    # Puntuación de la búsqueda difusa
+    SCORE_MATCH = 16
+    BONUS_BOUNDARY = 10
+    BONUS_FIRST = 8
+    BONUS_CONSECUTIVE = 6
+    MAX_GAP_PENALTY = 3
+    WORD_SEPARATORS = ' -_./'
+    
+    def __init__(self, applications, desktop_entries=None):
+        self.desktop_entries = desktop_entries
+        self.apps = []
+        self.categories = []
+        self.names = []
+        self.comments = []
+        self.execs = []
+        self.keywords = []
+        self.app_ids = []
+        self.name_bounds = []
+        self.exec_bounds = []
+        self.haystacks = []
+        # Cadenas unidas por campo para filtrar con regex (se crean al primer uso)
+        self.blobs = {}
+        # Última consulta difusa y todos sus candidatos, para acotar la siguiente
+        self.last_query = None
+        self.last_candidates = None
+        # Primer id de cada categoría: la app i de la categoría es offsets[cat] + i
+        self.offsets = {}
+        
+        for category, apps in applications.items():
+            category_key = normalize_search_text(category)
+            self.offsets[category] = len(self.apps)
+            for app in apps:
+                self.add(app, category, category_key)
+    
+    def __len__(self):
+        return len(self.apps)
+    
+    @staticmethod
+    def exec_basename(command):
+        """Basename of the program in an Exec line ('/usr/bin/foo --x' -> 'foo')"""
+        parts = command.split()
+        return os.path.basename(parts[0]) if parts else ''
+    
+    def add(self, app, category, category_key):
+        name = normalize_search_text(app.get('Name', ''))
+        comment = normalize_search_text(app.get('Comment', ''))
+        exec_name = normalize_search_text(self.exec_basename(app.get('Exec', '')))
+        # GenericName, Keywords y Name traducido del .desktop correspondiente
+        keywords = ''
+        if self.desktop_entries:
+            keywords = normalize_search_text(self.desktop_entries.keywords_for(app))
+        
+        self.apps.append(app)
+        self.categories.append(category)
+        self.names.append(name)
+        self.comments.append(comment)
+        self.execs.append(exec_name)
+        self.keywords.append(keywords)
+        self.app_ids.append(app_identity(app))
+        self.name_bounds.append(self.word_starts(name, strip_accents(' '.join(app.get('Name', '').split()))))
+        self.exec_bounds.append(self.word_starts(exec_name))
+        # Los campos se separan con '\n' para que una consulta no cruce de uno a otro
+        haystack = '\n'.join((name, comment, exec_name, category_key, keywords))
+        self.haystacks.append(haystack)
+    
+    @classmethod
+    def word_starts(cls, text, original=''):
+        """Positions where a word starts: after a separator or at a camelCase hump"""
+        # La comparación con el original solo vale si casefold no cambió la longitud
+        camel = original if len(original) == len(text) else ''
+        return frozenset(
+            i for i in range(len(text))
+            if i == 0 or text[i - 1] in cls.WORD_SEPARATORS
+            or (camel and camel[i].isupper() and camel[i - 1].islower())
+        )
+    
+    def search_ids(self, text):
+        """Ids of the entries whose name, comment, executable or category contain `text`"""
+        query = normalize_search_text(text)
+        if not query:
+            return []
+        # Una entrada puede coincidir en varios de sus campos
+        return list(dict.fromkeys(self.matching_ids('haystacks', re.escape(query))))
+    
+    def search(self, text):
+        """Apps matching `text`, in parse order"""
+        return [self.apps[i] for i in self.search_ids(text)]
+    
+    def substring_score(self, length, boundary, first):
+        """Score of a contiguous match of `length` characters"""
+        score = (self.SCORE_MATCH + self.BONUS_CONSECUTIVE) * length - self.BONUS_CONSECUTIVE
+        if boundary:
+            score += self.BONUS_BOUNDARY
+        if first:
+            score += self.BONUS_FIRST
+        return score
+    
+    def fuzzy_score(self, query, text, bounds):
+        """Score `query` as a subsequence of `text`, or None if it isn't one"""
+        best = None
+        pos = text.find(query)
+        if pos >= 0:
+            best = self.substring_score(len(query), pos in bounds, pos == 0)
+        
+        # Ida: primera aparición de cada carácter en orden
+        positions = []
+        pos = -1
+        for char in query:
+            pos = text.find(char, pos + 1)
+            if pos < 0:
+                return best
+            positions.append(pos)
+        
+        # Vuelta: acercar los caracteres al último para la ventana más corta
+        pos = positions[-1] + 1
+        for k in range(len(query) - 1, -1, -1):
+            pos = text.rfind(query[k], 0, pos)
+            positions[k] = pos
+        
+        score = self.BONUS_FIRST if positions[0] == 0 else 0
+        previous = None
+        for pos in positions:
+            score += self.SCORE_MATCH
+            if pos in bounds:
+                score += self.BONUS_BOUNDARY
+            if previous is not None:
+                if pos == previous + 1:
+                    score += self.BONUS_CONSECUTIVE
+                else:
+                    score -= min(pos - previous - 1, self.MAX_GAP_PENALTY)
+            previous = pos
+        return score if best is None else max(best, score)
+    
+    def blob(self, field):
+        """All values of a field joined by newlines, with the offset where each starts"""
+        cached = self.blobs.get(field)
+        if cached is None:
+            values = getattr(self, field)
+            starts = []
+            offset = 0
+            for value in values:
+                starts.append(offset)
+                offset += len(value) + 1
+            cached = self.blobs[field] = ('\n'.join(values), starts)
+        return cached
+    
+    def matching_ids(self, field, pattern):
+        """Ids whose field matches `pattern`, scanning one joined string in C"""
+        text, starts = self.blob(field)
+        # El resto de la línea forma parte del match: una coincidencia por entrada
+        line = re.compile('(?:%s)[^\n]*' % pattern, re.MULTILINE)
+        return [bisect.bisect_right(starts, match.start()) - 1 for match in line.finditer(text)]
+    
+    def fuzzy_candidates(self, query):
+        """Ids matching `query` by name, by executable and by any text.
+        If the query extends the previous one only its candidates are checked."""
+        subsequence = '[^\n]*?'.join(map(re.escape, query))
+        previous = self.last_candidates
+        if previous is not None and query.startswith(self.last_query):
+            # Lo que coincide con "fire" ya coincidía con "fir": basta filtrar
+            matches = re.compile(subsequence).search
+            names, execs, haystacks = self.names, self.execs, self.haystacks
+            name_ids = [i for i in previous if matches(names[i])]
+            exec_ids = [i for i in previous if matches(execs[i])]
+            text_ids = [i for i in previous if query in haystacks[i]]
+        else:
+            # Filtro en C: la consulta como subsecuencia dentro de una línea
+            name_ids = self.matching_ids('names', subsequence)
+            exec_ids = self.matching_ids('execs', subsequence)
+            text_ids = self.matching_ids('haystacks', re.escape(query))
+        
+        self.last_query = query
+        self.last_candidates = sorted(set(name_ids).union(exec_ids, text_ids))
+        return name_ids, exec_ids, text_ids
+    
+    def rank(self, text, limit, boosts=None):
+        """Ids of the best `limit` fuzzy matches of `text`, best first.
+        `boosts` maps app identities to extra points (frecency)."""
+        query = normalize_search_text(text)
+        if not query:
+            return []
+        
+        scores = {}
+        names, name_bounds = self.names, self.name_bounds
+        escaped = re.escape(query)
+        
+        if len(query) < self.FUZZY_MIN_LENGTH:
+            # Con 1-2 letras casi todo es subsecuencia: solo coincidencias
+            # contiguas, puntuadas por niveles de regex de mayor a menor
+            separators = re.escape(self.WORD_SEPARATORS)
+            word_start = '(?:^|(?<=[%s]))%s' % (separators, escaped)
+            length = len(query)
+            tiers = [
+                ('names', '^' + escaped, self.substring_score(length, True, True)),
+                ('names', word_start, self.substring_score(length, True, False)),
+                ('execs', '^' + escaped, self.substring_score(length, True, True) - self.BONUS_BOUNDARY),
+                ('names', escaped, self.substring_score(length, False, False)),
+                ('haystacks', escaped, self.SCORE_MATCH * length // 2),
+            ]
+            if length == 2:
+                # Iniciales de dos palabras ("gp" -> Gnome Paint)
+                initials = '(?:^|(?<=[%s]))%s[^\n]*?(?<=[%s])%s' % (
+                    separators, re.escape(query[0]), separators, re.escape(query[1]))
+                tiers.append(('names', initials,
+                              2 * (self.SCORE_MATCH + self.BONUS_BOUNDARY) - self.MAX_GAP_PENALTY))
+            tiers.sort(key=lambda tier: -tier[2])
+            for field, pattern, score in tiers:
+                for i in self.matching_ids(field, pattern):
+                    scores.setdefault(i, score)
+                # Los niveles que faltan puntúan menos: si ya hay bastantes, parar
+                if len(scores) >= limit:
+                    break
+            # Sin lista completa de candidatos: la próxima consulta recorre todo
+            self.last_query = None
+            self.last_candidates = None
+        else:
+            name_ids, exec_ids, text_ids = self.fuzzy_candidates(query)
+            for i in name_ids:
+                score = self.fuzzy_score(query, names[i], name_bounds[i])
+                if score is not None:
+                    scores[i] = score
+            # El ejecutable solo cuenta si el nombre no coincide (y pesa algo menos)
+            execs, exec_bounds = self.execs, self.exec_bounds
+            for i in exec_ids:
+                if i not in scores:
+                    score = self.fuzzy_score(query, execs[i], exec_bounds[i])
+                    if score is not None:
+                        scores[i] = score - self.BONUS_BOUNDARY
+            # Comentario o categoría: solo coincidencia exacta, con menos peso
+            # que cualquier coincidencia difusa, así que sobra si ya hay bastantes
+            if len(scores) < limit:
+                fallback = self.SCORE_MATCH * len(query) // 2
+                for i in text_ids:
+                    scores.setdefault(i, fallback)
+        
+        # A igual puntuación ganan los nombres cortos y luego el orden del menú
+        heap = []
+        app_ids = self.app_ids
+        for i, score in scores.items():
+            if boosts:
+                score += boosts.get(app_ids[i], 0)
+            item = (score, -len(names[i]), -i)
+            if len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+        
+        return [-item[2] for item in sorted(heap, reverse=True)]
+
+
+class LaunchHistory:
+    """
+    Historial de lanzamientos: log de solo-anexar con líneas
+    "tiempo<TAB>peso<TAB>app". La frecencia de cada app es la suma de sus
+    pesos con decaimiento exponencial; al compactar, cada app queda en una
+    sola línea con su peso ya decaído (el decaimiento no tiene memoria).
+    Se lee una vez por proceso.
+    """
+    HALF_LIFE_DAYS = 14
+    COMPACT_LINES = 200
+    MIN_SCORE = 0.05
+    
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.rate = math.log(2) / (self.HALF_LIFE_DAYS * 86400)
+        self.now = time.time()
+        self.scores = {}
+        self.lines = 0
+        self.load()
+    
+    def load(self):
+        start = time.monotonic()
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    parts = line.rstrip('\n').split('\t', 2)
+                    if len(parts) != 3:
+                        continue
+                    try:
+                        stamp = float(parts[0])
+                        weight = float(parts[1])
+                    except ValueError:
+                        continue
+                    self.lines += 1
+                    decayed = weight * math.exp(-self.rate * max(0.0, self.now - stamp))
+                    self.scores[parts[2]] = self.scores.get(parts[2], 0.0) + decayed
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error leyendo historial de lanzamientos: {e}")
+        profile_log(f"Launch history ({self.lines} lines)", start)
+    
+    def score(self, app_id):
+        return self.scores.get(app_id, 0.0)
+    
+    def bonuses(self, max_bonus):
+        """Search bonus per app: grows with frecency and saturates at max_bonus"""
+        return {app_id: max_bonus * score / (score + 3.0)
+                for app_id, score in self.scores.items()}
+    
+    def top(self, limit):
+        """App identities with the highest frecency"""
+        ranked = sorted(self.scores.items(), key=lambda item: -item[1])
+        return [app_id for app_id, score in ranked[:limit] if score >= self.MIN_SCORE]
+    
+    def record(self, app_info):
+        """Append one launch; compact the log when it grows too long"""
+        app_id = app_identity(app_info)
+        if not app_id:
+            return
+        now = time.time()
+        self.scores[app_id] = self.score(app_id) + math.exp(-self.rate * (self.now - now))
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(f"{now:.0f}\t1\t{app_id}\n")
+            self.lines += 1
+            if self.lines > self.COMPACT_LINES:
+                self.compact()
+        except OSError as e:
+            print(f"Error guardando historial de lanzamientos: {e}")
+    
+    def compact(self):
+        """Rewrite the log with one line per app, dropping forgotten ones"""
+        entries = [(app_id, score) for app_id, score in self.scores.items()
+                   if score >= self.MIN_SCORE]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for app_id, score in entries:
+                f.write(f"{self.now:.0f}\t{score:.4f}\t{app_id}\n")
+        os.replace(tmp_path, self.path)
+        self.lines = len(entries)
+
+
+class AppPrefetcher:
+    """
+    Calienta la caché de páginas antes de lanzar: el ejecutable de una app y
+    sus bibliotecas se leen en un hilo (posix_fadvise WILLNEED y lectura por
+    bloques), con un tope de bytes por segundo. Cada archivo se lee una sola
+    vez por sesión; si llegan muchas peticiones gana la más reciente.
+    """
+    MAX_PENDING = 4
+    MAX_APP_BYTES = 128 * 1024 * 1024
+    CHUNK = 1024 * 1024
+    MAX_LIBRARIES = 200
+    
+    # Tipos de segmento y de entrada dinámica de ELF
+    PT_LOAD, PT_DYNAMIC, PT_INTERP = 1, 2, 3
+    DT_NULL, DT_NEEDED, DT_STRTAB, DT_RPATH, DT_RUNPATH = 0, 1, 5, 15, 29
+    LD_SO_CONF = '/etc/ld.so.conf'
+    DEFAULT_LIBRARY_DIRS = ['/lib64', '/usr/lib64', '/lib', '/usr/lib', '/usr/local/lib']
+    
+    def __init__(self, path_index, rate_mb=PREFETCH_RATE_MB):
+        self.path_index = path_index
+        self.rate = rate_mb * 1024 * 1024
+        self.pending = deque(maxlen=self.MAX_PENDING)
+        self.requested = set()
+        self.warmed = set()
+        self.condition = threading.Condition()
+        self.thread = None
+        # Directorios de bibliotecas (se leen en el hilo, al primer uso)
+        self.library_path = None
+    
+    def request(self, plan):
+        """Queue the program of a launch plan (cheap, called from the main thread)"""
+        if plan['directory'] or not plan['command']:
+            return
+        argv = plan['argv'] or plan['command'].split()[:1]
+        name = argv[0] if argv else ''
+        if not name or name in self.requested:
+            return
+        self.requested.add(name)
+        with self.condition:
+            self.pending.append(name)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+    
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                name = self.pending.pop()
+            try:
+                self.warm(name)
+            except Exception as e:
+                print(f"Error en lectura anticipada de {name}: {e}")
+    
+    def warm(self, name):
+        started = time.monotonic()
+        executable = self.path_index.which(name)
+        if not executable:
+            return
+        files = [executable] + self.dependencies(executable)
+        budget = self.MAX_APP_BYTES
+        for path in files:
+            if budget <= 0:
+                break
+            if path not in self.warmed:
+                self.warmed.add(path)
+                budget -= self.readahead(path, budget)
+        profile_log(f"Readahead {name} ({len(files)} files)", started)
+    
+    def dependencies(self, executable):
+        """Shared libraries of an ELF binary, or the interpreter of a script"""
+        try:
+            with open(executable, 'rb') as f:
+                head = f.read(256)
+        except OSError:
+            return []
+        if head.startswith(b'#!'):
+            words = head[2:].split(b'\n', 1)[0].decode('utf-8', 'replace').split()
+            if words and os.path.basename(words[0]) == 'env' and len(words) > 1:
+                words = words[1:]
+            interpreter = self.path_index.which(words[0]) if words else None
+            if not interpreter or interpreter == executable:
+                return []
+            return [interpreter] + self.elf_libraries(interpreter)
+        if head.startswith(b'\x7fELF'):
+            return self.elf_libraries(executable)
+        return []
+    
+    def elf_libraries(self, executable):
+        """Dynamic loader and shared libraries (DT_NEEDED, transitively) of an ELF file.
+        Resolved like ld.so would, without running ldd."""
+        info = self.elf_info(executable)
+        if not info:
+            return []
+        bits, interpreter = info[0], info[1]
+        libraries = [interpreter] if interpreter and os.path.isfile(interpreter) else []
+        seen = set()
+        pending = deque([info])
+        while pending and len(libraries) < self.MAX_LIBRARIES:
+            _, _, needed, rpaths = pending.popleft()
+            for name in needed:
+                if name in seen:
+                    continue
+                seen.add(name)
+                library = self.find_library(name, bits, rpaths)
+                if not library:
+                    continue
+                libraries.append(library)
+                library_info = self.elf_info(library)
+                if library_info:
+                    pending.append(library_info)
+        return libraries
+    
+    def find_library(self, name, bits, rpaths):
+        """Path of a DT_NEEDED name of the right ELF class, or None"""
+        if '/' in name:
+            return name if os.path.isfile(name) else None
+        if self.library_path is None:
+            self.library_path = self.read_ld_so_conf(self.LD_SO_CONF, set()) + self.DEFAULT_LIBRARY_DIRS
+        for directory in rpaths + self.library_path:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path):
+                # En sistemas multilib la misma biblioteca existe en 32 y 64 bits
+                try:
+                    with open(path, 'rb') as f:
+                        ident = f.read(5)
+                except OSError:
+                    continue
+                if ident[:4] == b'\x7fELF' and ident[4] == bits:
+                    return path
+        return None
+    
+    @classmethod
+    def read_ld_so_conf(cls, path, seen):
+        """Library directories of ld.so.conf, following its include lines"""
+        if path in seen:
+            return []
+        seen.add(path)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        directories = []
+        for line in lines:
+            line = line.split('#', 1)[0].strip()
+            if line.startswith('include'):
+                pattern = line[len('include'):].strip()
+                if not os.path.isabs(pattern):
+                    pattern = os.path.join(os.path.dirname(path), pattern)
+                for included in sorted(glob.glob(pattern)):
+                    directories += cls.read_ld_so_conf(included, seen)
+            elif line:
+                directories.append(line)
+        return directories
+    
+    @classmethod
+    def elf_info(cls, path):
+        """(ELF class, PT_INTERP, DT_NEEDED names, RPATH/RUNPATH dirs) of a file, or None"""
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(64)
+                if len(header) < 52 or not header.startswith(b'\x7fELF'):
+                    return None
+                bits = header[4]
+                order = '<' if header[5] == 1 else '>'
+                if bits == 2:
+                    phoff, = struct.unpack_from(order + 'Q', header, 32)
+                    phentsize, phnum = struct.unpack_from(order + 'HH', header, 54)
+                    ph_format, dyn_format = order + 'IIQQQQ', order + 'qQ'
+                elif bits == 1:
+                    phoff, = struct.unpack_from(order + 'I', header, 28)
+                    phentsize, phnum = struct.unpack_from(order + 'HH', header, 42)
+                    ph_format, dyn_format = order + 'IIIIII', order + 'iI'
+                else:
+                    return None
+                
+                f.seek(phoff)
+                table = f.read(phentsize * phnum)
+                loads, dynamic, interpreter = [], None, None
+                for i in range(phnum):
+                    # Los campos del program header van en otro orden en 32 bits
+                    if bits == 2:
+                        p_type, _, offset, vaddr, _, filesz = struct.unpack_from(ph_format, table, i * phentsize)
+                    else:
+                        p_type, offset, vaddr, _, filesz, _ = struct.unpack_from(ph_format, table, i * phentsize)
+                    if p_type == cls.PT_LOAD:
+                        loads.append((vaddr, offset, filesz))
+                    elif p_type == cls.PT_DYNAMIC:
+                        dynamic = (offset, filesz)
+                    elif p_type == cls.PT_INTERP:
+                        f.seek(offset)
+                        interpreter = f.read(min(filesz, 4096)).split(b'\0')[0].decode('utf-8', 'replace')
+                if dynamic is None:
+                    return bits, interpreter, [], []
+                
+                f.seek(dynamic[0])
+                data = f.read(min(dynamic[1], 64 * 1024))
+                size = struct.calcsize(dyn_format)
+                needed, paths, strtab = [], [], None
+                for tag, value in struct.iter_unpack(dyn_format, data[:len(data) - len(data) % size]):
+                    if tag == cls.DT_NULL:
+                        break
+                    if tag == cls.DT_NEEDED:
+                        needed.append(value)
+                    elif tag in (cls.DT_RPATH, cls.DT_RUNPATH):
+                        paths.append(value)
+                    elif tag == cls.DT_STRTAB:
+                        strtab = value
+                # DT_STRTAB es una dirección virtual: pasarla a posición en el archivo
+                base = None
+                for vaddr, offset, filesz in loads:
+                    if strtab is not None and vaddr <= strtab < vaddr + filesz:
+                        base = strtab - vaddr + offset
+                        break
+                if base is None:
+                    return bits, interpreter, [], []
+                
+                def string(index):
+                    f.seek(base + index)
+                    return f.read(4096).split(b'\0')[0].decode('utf-8', 'replace')
+                
+                origin = os.path.dirname(os.path.abspath(path))
+                rpaths = [directory.replace('${ORIGIN}', origin).replace('$ORIGIN', origin)
+                          for value in paths for directory in string(value).split(':') if directory]
+                return bits, interpreter, [string(value) for value in needed], rpaths
+        except (OSError, struct.error):
+            return None
+    
+    def readahead(self, path, limit):
+        """Read up to `limit` bytes of a file into the page cache; returns bytes read"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return 0
+        done = 0
+        try:
+            if hasattr(os, 'posix_fadvise'):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            # Además se lee: en capas aufs/overlay el aviso no siempre llega al SFS
+            while done < limit:
+                chunk = os.read(fd, min(self.CHUNK, limit - done))
+                if not chunk:
+                    break
+                done += len(chunk)
+                time.sleep(len(chunk) / self.rate)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+        return done
+
+
+class JobRunner:
+    """
+    Trabajos secundarios (notify-send, búsquedas en disco...) fuera del hilo
+    de GTK: unos hilos daemon los ejecutan y el callback de fin corre en el
+    bucle principal. Cada trabajo tiene un tope de tiempo; si se pasa, el
+    callback recibe TimeoutError y el resultado tardío se descarta. Las
+    métricas se llevan por tipo de trabajo.
+    """
+    WORKERS = 2
+    DEFAULT_TIMEOUT = 5.0
+    
+    def __init__(self, workers=WORKERS):
+        self.size = workers
+        self.jobs = queue.Queue()
+        self.workers = []
+        self.metrics = {}
+    
+    def submit(self, kind, func, *args, on_done=None, timeout=DEFAULT_TIMEOUT):
+        """Run func(*args) in a worker; on_done(result, error) is called on the main loop"""
+        job = {'kind': kind, 'func': func, 'args': args, 'on_done': on_done,
+               'timeout': timeout, 'done': False, 'timer': None}
+        if on_done:
+            job['timer'] = GLib.timeout_add(int(timeout * 1000), self.on_timeout, job)
+        if len(self.workers) < self.size and self.jobs.unfinished_tasks >= len(self.workers):
+            worker = threading.Thread(target=self.work, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        self.jobs.put(job)
+        return job
+    
+    def spawn(self, kind, argv, on_done=None, timeout=DEFAULT_TIMEOUT):
+        """Run a helper program; the result is its CompletedProcess (killed on timeout)"""
+        return self.submit(kind, self.run_program, argv, timeout, on_done=on_done, timeout=timeout)
+    
+    @staticmethod
+    def run_program(argv, timeout):
+        return subprocess.run(argv, stdin=subprocess.DEVNULL, capture_output=True,
+                              text=True, timeout=timeout)
+    
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            started = time.monotonic()
+            result = error = None
+            try:
+                result = job['func'](*job['args'])
+            except Exception as e:
+                error = e
+            elapsed = (time.monotonic() - started) * 1000
+            self.jobs.task_done()
+            GLib.idle_add(self.finish, job, result, error, elapsed)
+    
+    def finish(self, job, result, error, elapsed):
+        """Main loop: record metrics and hand the result to the callback"""
+        if job['timer']:
+            GLib.source_remove(job['timer'])
+            job['timer'] = None
+        timed_out = (job['done'] or isinstance(error, subprocess.TimeoutExpired)
+                     or elapsed > job['timeout'] * 1000)
+        self.record(job['kind'], elapsed, error, timed_out)
+        if not job['done']:
+            self.complete(job, result, error)
+        return False
+    
+    def on_timeout(self, job):
+        job['timer'] = None
+        if not job['done']:
+            self.complete(job, None, TimeoutError(f"{job['kind']} took more than {job['timeout']} s"))
+        return False
+    
+    def complete(self, job, result, error):
+        job['done'] = True
+        if job['on_done']:
+            try:
+                job['on_done'](result, error)
+            except Exception as e:
+                print(f"Error en el callback de {job['kind']}: {e}")
+    
+    def record(self, kind, elapsed, error, timed_out):
+        metric = self.metrics.setdefault(kind, {'runs': 0, 'failures': 0, 'timeouts': 0,
+                                                'total_ms': 0.0, 'max_ms': 0.0})
+        metric['runs'] += 1
+        metric['failures'] += error is not None
+        metric['timeouts'] += timed_out
+        metric['total_ms'] += elapsed
+        metric['max_ms'] = max(metric['max_ms'], elapsed)
+        if PROFILE:
+            print(f"⏱️ Job {kind}: {elapsed:.1f} ms ({metric['runs']} runs, {metric['failures']} failed, "
+                  f"{metric['timeouts']} timed out, max {metric['max_ms']:.1f} ms)")
+
+
+class SearchProvider:
+    """
+    Fuente de resultados para la búsqueda además de las apps del menú.
+    search() devuelve dicts con el formato de las apps ('Name', 'Exec',
+    'Icon', 'Comment'), así se muestran y lanzan como cualquier app.
+    Los proveedores con threaded = True tocan el disco y corren en el JobRunner.
+    """
+    name = 'base'
+    threaded = False
+    
+    def search(self, query, limit, should_stop):
+        """Results for the normalized `query`; poll should_stop() in long loops"""
+        return []
+    
+    @staticmethod
+    def result(name, command, icon, comment=''):
+        return {'Name': name, 'Exec': command, 'Icon': icon, 'Comment': comment or name,
+                'Terminal': False, 'Categories': []}
+
+
+class PlacesProvider(SearchProvider):
+    """Carpetas de la columna Places (Home, Descargas, ...)"""
+    name = 'places'
+    
+    def __init__(self, places):
+        # places: [(etiqueta, ruta, icono)]
+        self.places = [(label, os.path.expanduser(path), icon,
+                        normalize_search_text(f"{label} {os.path.basename(os.path.expanduser(path))}"))
+                       for label, path, icon in places]
+    
+    def search(self, query, limit, should_stop):
+        return [self.result(label, path, icon, path)
+                for label, path, icon, key in self.places if query in key][:limit]
+
+
+class FavoritesProvider(SearchProvider):
+    """Favoritos de la configuración"""
+    name = 'favorites'
+    
+    def __init__(self, favorites):
+        self.favorites = [(fav, normalize_search_text(fav.get('name', ''))) for fav in favorites]
+    
+    def search(self, query, limit, should_stop):
+        return [self.result(fav.get('name', 'App'), fav.get('exec', ''), fav.get('icon', 'star'))
+                for fav, key in self.favorites if query in key and fav.get('exec')][:limit]
+
+
+class RecentFilesProvider(SearchProvider):
+    """
+    Archivos recientes de recently-used.xbel. El archivo puede pesar megas:
+    se lee con iterparse liberando cada elemento, se guardan solo los N más
+    nuevos en un heap acotado, y el resultado se reutiliza mientras no cambie
+    la fecha de modificación. Se ejecuta siempre fuera del hilo principal.
+    """
+    name = 'recent'
+    threaded = True
+    KEEP = 200
+    
+    def __init__(self, path="~/.local/share/recently-used.xbel"):
+        self.path = os.path.expanduser(path)
+        self.lock = threading.Lock()
+        self.cache_key = None
+        # [(fecha, ruta, clave de búsqueda)], del más nuevo al más viejo
+        self.items = []
+    
+    def recent(self, should_stop=lambda: False):
+        """Newest recent files, re-reading the xbel only if it changed"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return []
+        key = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            if key == self.cache_key:
+                return self.items
+        # Se parsea sin el lock: una consulta nueva no espera a la anterior
+        start = time.monotonic()
+        items = self.parse(should_stop)
+        if items is None:
+            return []
+        with self.lock:
+            self.items, self.cache_key = items, key
+        profile_log(f"recently-used.xbel ({st.st_size // 1024} KiB)", start)
+        return items
+    
+    def parse(self, should_stop):
+        heap = []
+        root = None
+        try:
+            for count, (event, elem) in enumerate(ET.iterparse(self.path, events=('start', 'end'))):
+                if root is None:
+                    root = elem
+                if event != 'end' or elem.tag != 'bookmark':
+                    continue
+                if count % 256 == 0 and should_stop():
+                    return None
+                href = elem.get('href', '')
+                if href.startswith('file://'):
+                    # Fechas ISO 8601 en UTC: se ordenan como texto
+                    stamp = elem.get('visited') or elem.get('modified') or elem.get('added') or ''
+                    item = (stamp, urllib.parse.unquote(href[len('file://'):]))
+                    if len(heap) < self.KEEP:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+                # Liberar el elemento ya procesado (y su lugar en la raíz)
+                elem.clear()
+                root.clear()
+        except (OSError, ET.ParseError) as e:
+            print(f"Error leyendo archivos recientes: {e}")
+            if not heap:
+                return []
+        return [(stamp, path, normalize_search_text(os.path.basename(path)))
+                for stamp, path in sorted(heap, reverse=True)]
+    
+    def to_result(self, path):
+        return self.result(os.path.basename(path), f"xdg-open {shlex.quote(path)}",
+                           'document-open-recent', path)
+    
+    def search(self, query, limit, should_stop):
+        results = []
+        for stamp, path, key in self.recent(should_stop):
+            if query in key:
+                results.append(self.to_result(path))
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class PathIndex:
+    """
+    Ejecutables de todos los directorios del PATH, en memoria. Se arma con
+    os.scandir y se rehace solo cuando cambia el PATH o la fecha de
+    modificación de alguno de sus directorios.
+    """
+    CHECK_INTERVAL = 2.0
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.paths = {}
+        self.names = []
+        self.stamp = None
+        self.checked = 0.0
+    
+    def directories(self):
+        seen = []
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            if directory and directory not in seen:
+                seen.append(directory)
+        return seen
+    
+    def current_stamp(self, directories):
+        stamp = []
+        for directory in directories:
+            try:
+                stamp.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                stamp.append((directory, None))
+        return tuple(stamp)
+    
+    def scan(self, directories):
+        started = time.monotonic()
+        paths = {}
+        for directory in directories:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.name in paths:
+                            continue  # gana el primero del PATH, como en el shell
+                        try:
+                            if entry.is_dir():
+                                continue
+                        except OSError:
+                            continue
+                        if os.access(entry.path, os.X_OK):
+                            paths[entry.name] = entry.path
+            except OSError:
+                continue
+        self.paths = paths
+        self.names = sorted(paths)
+        profile_log(f"PATH index ({len(paths)} commands)", started)
+    
+    def refresh(self):
+        """Rescan if PATH or one of its directories changed (checked every few seconds)"""
+        with self.lock:
+            now = time.monotonic()
+            if self.stamp is not None and now - self.checked < self.CHECK_INTERVAL:
+                return
+            self.checked = now
+            directories = self.directories()
+            stamp = self.current_stamp(directories)
+            if stamp != self.stamp:
+                self.scan(directories)
+                self.stamp = stamp
+    
+    def which(self, name):
+        """Full path of a bare command, or None (like shutil.which)"""
+        if not name:
+            return None
+        if os.sep in name:
+            return name if os.access(name, os.X_OK) and not os.path.isdir(name) else None
+        self.refresh()
+        return self.paths.get(name)
+    
+    def complete(self, prefix, limit=None):
+        """Commands starting with prefix, in alphabetical order"""
+        self.refresh()
+        names = self.names
+        start = bisect.bisect_left(names, prefix)
+        matches = []
+        for name in names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+            if limit and len(matches) >= limit:
+                break
+        return matches
+
+
+class TerminalServer:
+    """
+    Terminal residente urxvtd: cada ventana nueva es un urxvtc que solo pide
+    al daemon que la abra, así no se arranca un emulador entero por app. El
+    daemon se comprueba (y se inicia) en un trabajo de fondo al abrir el
+    menú y sigue vivo al salir; al lanzar solo se mira ese estado.
+    """
+    CLIENT = 'urxvtc'
+    DAEMON = ['urxvtd', '-q', '-o', '-f']
+    URXVT_NAMES = ('urxvt', 'rxvt-unicode', 'rxvt', 'urxvtc')
+    WRAPPERS = ('defaultterminal', 'x-terminal-emulator')
+    
+    def __init__(self, path_index):
+        self.path_index = path_index
+        self.usable = None
+        self.wrapper_targets = {}
+        # True cuando warm() vio el socket del daemon respondiendo
+        self.ready = False
+    
+    def socket_path(self):
+        return os.environ.get('RXVT_SOCKET') or os.path.expanduser(
+            f"~/.urxvt/urxvtd-{os.uname().nodename}")
+    
+    def available(self):
+        if self.usable is None:
+            self.usable = bool(self.path_index.which(self.CLIENT) and
+                               self.path_index.which(self.DAEMON[0]))
+        return self.usable
+    
+    def handles(self, terminal):
+        """True when `terminal` is urxvt (directly or via defaultterminal) and urxvtd exists"""
+        if not terminal or not self.available():
+            return False
+        name = os.path.basename(terminal)
+        if name in self.URXVT_NAMES:
+            return True
+        if name not in self.WRAPPERS:
+            return False
+        if name not in self.wrapper_targets:
+            self.wrapper_targets[name] = self.wraps_urxvt(name)
+        return self.wrapper_targets[name]
+    
+    def wraps_urxvt(self, name):
+        """defaultterminal suele ser un enlace o un script de una línea"""
+        path = self.path_index.which(name)
+        if not path:
+            return False
+        if os.path.basename(os.path.realpath(path)) in self.URXVT_NAMES:
+            return True
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(512)
+        except OSError:
+            return False
+        return head.startswith(b'#!') and b'rxvt' in head
+    
+    def running(self):
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.settimeout(0.2)
+        try:
+            client.connect(self.socket_path())
+            return True
+        except OSError:
+            return False
+        finally:
+            client.close()
+    
+    def ensure(self):
+        """Start urxvtd if its socket is not answering; True when it is ready"""
+        if self.running():
+            return True
+        started = time.monotonic()
+        try:
+            subprocess.run(self.DAEMON, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                           start_new_session=True, timeout=2)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"No se pudo iniciar urxvtd: {e}")
+            return False
+        # Con -f el daemon se separa después de abrir el socket
+        for _ in range(20):
+            if self.running():
+                profile_log("urxvtd started", started)
+                return True
+            time.sleep(0.025)
+        return False
+    
+    def warm(self):
+        """Background job: start urxvtd when the default terminal is urxvt"""
+        if self.handles(terminal_command(self.path_index)):
+            self.ready = self.ensure()
+        return self.ready
+    
+    def client_argv(self, args, execute=True):
+        """
+        urxvtc argv that runs `args` (execute) or passes them as urxvt
+        options; None when the daemon is not known to be up (no waiting
+        on the click path: the caller uses the plain terminal).
+        """
+        if not self.ready:
+            return None
+        return [self.CLIENT] + (['-e'] + args if execute else args)
+
+
+class PathCommandsProvider(SearchProvider):
+    """Ejecutables del PATH que empiezan por la consulta"""
+    name = 'commands'
+    threaded = True
+    
+    def __init__(self, path_index):
+        self.path_index = path_index
+    
+    def search(self, query, limit, should_stop):
+        if ' ' in query or should_stop():
+            return []
+        return [self.result(name, name, 'utilities-terminal', TR.get('Run command', 'Run command'))
+                for name in self.path_index.complete(query, limit)]
+
+
+class SearchBroker:
+    """
+    Reparte cada consulta entre los proveedores extra. Los rápidos responden
+    en el hilo principal; los que tocan el disco corren en el JobRunner. Lo que llega
+    antes del plazo se entrega junto y lo que llega tarde se agrega al llegar;
+    los resultados de consultas anteriores se descartan.
+    """
+    def __init__(self, providers, deliver, jobs, deadline_ms=SEARCH_PROVIDER_DEADLINE_MS):
+        self.providers = providers
+        self.deliver = deliver
+        self.jobs = jobs
+        self.deadline_ms = deadline_ms
+        self.generation = 0
+        self.pending = []
+        self.deadline_source = None
+    
+    def submit(self, query):
+        """Start a new query (an empty one just cancels the previous)"""
+        self.generation += 1
+        generation = self.generation
+        if self.deadline_source:
+            GLib.source_remove(self.deadline_source)
+            self.deadline_source = None
+        self.pending = []
+        if not query:
+            return
+        
+        stop_at = time.monotonic() + SEARCH_PROVIDER_TIMEOUT_MS / 1000.0
+        should_stop = lambda: generation != self.generation or time.monotonic() > stop_at
+        
+        ready = []
+        for provider in self.providers:
+            if provider.threaded:
+                # Las consultas viejas que sigan en cola salen enseguida por should_stop
+                self.jobs.submit(f"search-{provider.name}", self.run_provider,
+                                 provider, query, should_stop,
+                                 on_done=lambda results, error, provider=provider:
+                                     self.on_results(generation, provider, results or []),
+                                 timeout=SEARCH_PROVIDER_TIMEOUT_MS / 1000.0)
+            else:
+                results = self.run_provider(provider, query, should_stop)
+                if results:
+                    ready.append((provider, results))
+        if ready:
+            self.deliver(ready)
+        self.deadline_source = GLib.timeout_add(self.deadline_ms, self.on_deadline, generation)
+    
+    def run_provider(self, provider, query, should_stop):
+        start = time.monotonic()
+        try:
+            results = provider.search(query, SEARCH_PROVIDER_LIMIT, should_stop)
+        except Exception as e:
+            print(f"Error en proveedor de búsqueda {provider.name}: {e}")
+            results = []
+        profile_log(f"Provider {provider.name} '{query}' ({len(results)})", start)
+        return results
+    
+    def on_results(self, generation, provider, results):
+        """Main thread: keep results until the deadline, or show them if late"""
+        if results and generation == self.generation:
+            if self.deadline_source:
+                self.pending.append((provider, results))
+            else:
+                self.deliver([(provider, results)])
+        return False
+    
+    def on_deadline(self, generation):
+        self.deadline_source = None
+        if generation == self.generation and self.pending:
+            self.deliver(self.pending)
+        self.pending = []
+        return False
+
+
+class HoverIntentTracker:
+    """
+    Sigue velocidad y dirección del puntero sobre el menú para decidir cuándo
+    activar una categoría (al estilo del triángulo "menu-aim"): si el puntero
+    viaja hacia la columna de aplicaciones no se cambia de categoría.
+    """
+    def __init__(self, max_samples=4, max_age_ms=120):
+        self.samples = deque(maxlen=max_samples)
+        self.max_age_ms = max_age_ms
+        
+    def add_sample(self, x, y, t):
+        """Registrar una posición en coordenadas de pantalla (t en ms de GDK)"""
+        self.samples.append((x, y, t))
+        
+    def _recent(self):
+        if len(self.samples) < 2:
+            return None
+        x1, y1, t1 = self.samples[-1]
+        for x0, y0, t0 in self.samples:
+            if t1 - t0 <= self.max_age_ms and (x0, y0) != (x1, y1):
+                return (x0, y0, t0), (x1, y1, t1)
+        return None
+        
+    def speed(self):
+        """Velocidad reciente en píxeles por milisegundo"""
+        pair = self._recent()
+        if not pair:
+            return 0.0
+        (x0, y0, t0), (x1, y1, t1) = pair
+        return math.hypot(x1 - x0, y1 - y0) / max(1, t1 - t0)
+        
+    def is_aiming(self, rect):
+        """True si el último tramo del puntero apunta al rectángulo (x, y, w, h)"""
+        pair = self._recent()
+        if not pair or rect is None:
+            return False
+        (x0, y0, _), (x1, y1, _) = pair
+        left, top, width, height = rect
+        # Debe moverse hacia la derecha y seguir a la izquierda del área
+        if x1 <= x0 or x1 >= left:
+            return False
+        return self._in_triangle((x1, y1), (x0, y0), (left, top), (left, top + height))
+        
+    @staticmethod
+    def _in_triangle(p, a, b, c):
+        def sign(p1, p2, p3):
+            return (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p2[0] - p3[0]) * (p1[1] - p3[1])
+        d1 = sign(p, a, b)
+        d2 = sign(p, b, c)
+        d3 = sign(p, c, a)
+        has_neg = d1 < 0 or d2 < 0 or d3 < 0
+        has_pos = d1 > 0 or d2 > 0 or d3 > 0
+        return not (has_neg and has_pos)
+
+
+class AppGridNavigator:
+    """
+    Modelo de navegación con teclado para el FlowBox de aplicaciones.
+    Trabaja sobre la lista de hijos de la vista visible (categoría,
+    búsqueda o favoritos) y mantiene en caché el número de columnas
+    (recalculado en size-allocate) y el índice seleccionado, así cada flecha
+    cuesta O(1) en lugar de recorrer get_children() en cada pulsación.
+    """
+    def __init__(self, flowbox, scrolled):
+        self.flowbox = flowbox
+        self.scrolled = scrolled
+        self.items = []
+        self.columns = 1
+        self.row_height = 0
+        self.index = -1
+        
+        flowbox.connect("size-allocate", self.on_size_allocate)
+        flowbox.connect("child-activated", self.on_child_activated)
+        
+    @property
+    def count(self):
+        return len(self.items)
+        
+    def set_items(self, items):
+        """Cambia la vista activa; la lista puede seguir creciendo mientras carga"""
+        self.items = items
+        self.index = -1
+            
+    def on_child_activated(self, flowbox, child):
+        try:
+            self.index = self.items.index(child)
+        except ValueError:
+            self.index = -1
+        
+    def on_size_allocate(self, flowbox, allocation):
+        """Recalcula columnas y alto de fila solo cuando cambia el layout"""
+        if not self.items:
+            self.columns = 1
+            self.row_height = 0
+            return
+        
+        first_alloc = self.items[0].get_allocation()
+        self.row_height = first_alloc.height + flowbox.get_row_spacing()
+        
+        # Solo se recorre la primera fila (como máximo max_children_per_line)
+        cols = 1
+        limit = min(self.count, flowbox.get_max_children_per_line())
+        for i in range(1, limit):
+            if self.items[i].get_allocation().y != first_alloc.y:
+                break
+            cols += 1
+        self.columns = cols
+        
+    def page_rows(self):
+        """Número de filas completas visibles en el ScrolledWindow"""
+        if self.row_height <= 0:
+            return 1
+        page_size = self.scrolled.get_vadjustment().get_page_size()
+        return max(1, int(page_size // self.row_height))
+        
+    def move(self, keyval):
+        """Calcula el nuevo índice para la tecla y selecciona ese hijo"""
+        if self.count == 0:
+            return
+        
+        # Los clics del ratón actualizan el índice vía child-activated
+        current = self.index if self.index < self.count else -1
+        
+        cols = self.columns
+        last = self.count - 1
+        new_index = -1
+        
+        if keyval == Gdk.KEY_Down:
+            if current >= 0:
+                new_index = current + cols
+        elif keyval == Gdk.KEY_Up:
+            if current >= 0:
+                new_index = current - cols
+        elif keyval == Gdk.KEY_Right:
+            new_index = current + 1 if current >= 0 else 0
+        elif keyval == Gdk.KEY_Left:
+            # Ir al final si estamos al principio
+            new_index = current - 1 if current > 0 else last
+        elif keyval == Gdk.KEY_Home:
+            new_index = 0
+        elif keyval == Gdk.KEY_End:
+            new_index = last
+        elif keyval == Gdk.KEY_Page_Down:
+            step = self.page_rows() * cols
+            new_index = min(last, current + step) if current >= 0 else min(last, step)
+        elif keyval == Gdk.KEY_Page_Up:
+            step = self.page_rows() * cols
+            new_index = max(0, current - step) if current >= 0 else 0
+        
+        if 0 <= new_index <= last:
+            self.select_index(new_index)
+            
+    def select_index(self, index):
+        """Selecciona el hijo en la posición dada y lo hace visible"""
+        child = self.items[index]
+        self.index = index
+        self.flowbox.unselect_all()
+        self.flowbox.select_child(child)
+        child.grab_focus()
+        self.scroll_to_child(child)
+        
+    def scroll_to_child(self, child):
+        """Ajusta el scroll usando solo la geometría del hijo seleccionado"""
+        viewport = self.scrolled.get_child()
+        content = viewport.get_child() if viewport else None
+        if content is None:
+            return
+        coords = child.translate_coordinates(content, 0, 0)
+        if not coords:
+            return
+        y = coords[1]
+        height = child.get_allocated_height()
+        
+        vadj = self.scrolled.get_vadjustment()
+        value = vadj.get_value()
+        page_size = vadj.get_page_size()
+        if y < value:
+            vadj.set_value(y)
+        elif y + height > value + page_size:
+            vadj.set_value(y + height - page_size)
+
+
 class ArcMenuLauncher(Gtk.Window):
     def __init__(self, icon_size=None, jwm_file=None, x=None, y=None):
         super().__init__(title="PyMenuPup")
+        self.set_name("pymenu")
         
         self.config_manager = ConfigManager()
         self.config = self.config_manager.config
@@ -785,7 +2498,37 @@ class ArcMenuLauncher(Gtk.Window):
         self.tray_config = self.parser.parse_tray_config()
         self.applications = self.parser.parse_jwm_menu()
         self.apps_flowbox = None
+        self.apps_navigator = None
         self.categories_listbox = None
+        self.category_order = []
+        
+        # Vistas de aplicaciones ya construidas: clave -> [Gtk.FlowBoxChild]
+        # (clave = categoría, "__search__" o "__favorites__")
+        self.category_children = {}
+        self.category_built = {}
+        self.category_loading = {}
+        self.visible_category = None
+        # Búsqueda en el sitio: id del índice -> hijo de categoría, y ids visibles
+        self.entry_children = {}
+        self.search_matches = set()
+        self.search_ids = []
+        self.search_rank = {}
+        self.extra_sort_key = 0
+        # Búsqueda con debounce adaptativo (ms): ritmo de tecleo y coste medio
+        self.search_source = None
+        self.search_materialize_source = None
+        self.search_missing = []
+        self.search_last_key = None
+        self.search_pending_since = None
+        self.search_key_interval = SEARCH_DEBOUNCE_MIN_MS
+        self.search_cost = 0.0
+        self.prebuild_source = None
+        self.prebuild_queue = []
+        self.build_source = None
+        self.build_stages = []
+        self.build_started = None
+        self.places_box = None
+        self.places_font_desc = None
         self.search_entry = None
         self.profile_image = None
     
@@ -794,6 +2537,25 @@ class ArcMenuLauncher(Gtk.Window):
         self.hover_timeout = None
         self.restore_timeout = None
         self.mouse_in_menu = False
+        self.hover_intent = HoverIntentTracker()
+        self.launch_history = LaunchHistory()
+        self.frecency_bonus = self.launch_history.bonuses(FRECENCY_MAX_BONUS)
+        self.recent_provider = RecentFilesProvider()
+        self.path_index = PathIndex()
+        self.prefetcher = AppPrefetcher(self.path_index)
+        self.terminal_server = TerminalServer(self.path_index)
+        self.jobs = JobRunner()
+        if self.parser.desktop_entries_stale:
+            # Caché de .desktop ausente o vieja: la ventana sale ya y las
+            # palabras clave de la búsqueda llegan cuando termina el escaneo
+            self.reload_desktop_entries(force=False)
+        self.prefetch_timeout = None
+        self.launch_started = None
+        self.bus_used = False
+        self.search_broker = SearchBroker(self.create_search_providers(), self.show_provider_results, self.jobs)
+        self.pending_hover_category = None
+        self.hover_started = None
+        self.apps_scrolled = None
     
         self.selected_category = None
         self.hovered_category = None
@@ -804,6 +2566,7 @@ class ArcMenuLauncher(Gtk.Window):
         self.pos_x = x
         self.pos_y = y
         self.context_menu_active = False
+        self.css_provider = None
     
         screen = Gdk.Screen.get_default()
         visual = screen.get_rgba_visual()
@@ -820,6 +2583,7 @@ class ArcMenuLauncher(Gtk.Window):
         self.file_monitor = self.jwm_file.monitor_file(Gio.FileMonitorFlags.NONE, None)
         self.file_monitor.connect("changed", self.on_jwm_file_changed)
         print(f"{TR['Now monitoring JWM file for changes:']} {jwm_file_path}")
+        self.setup_desktop_monitors()
         if hasattr(self.parser, 'xfce_config_file') and os.path.exists(self.parser.xfce_config_file):
             try:
                 xfce_file = Gio.File.new_for_path(self.parser.xfce_config_file)
@@ -828,15 +2592,58 @@ class ArcMenuLauncher(Gtk.Window):
                 print(f"👀 Monitoreando cambios XFCE panel: {self.parser.xfce_config_file}")
             except Exception as e:
                 print(f"⚠️  Error monitoreando XFCE: {e}")
+    def setup_desktop_monitors(self):
+        """Keep the desktop-entry database fresh while the menu is open"""
+        self.desktop_monitors = []
+        self.desktop_reload_timeout = None
+        for directory in DESKTOP_DIRS:
+            if not os.path.isdir(directory):
+                continue
+            try:
+                monitor = Gio.File.new_for_path(directory).monitor_directory(Gio.FileMonitorFlags.NONE, None)
+                monitor.connect("changed", self.on_desktop_dir_changed)
+                self.desktop_monitors.append(monitor)
+            except Exception as e:
+                print(f"⚠️  Error monitoreando {directory}: {e}")
+    
+    def on_desktop_dir_changed(self, monitor, file, other_file, event_type):
+        """Rescan .desktop files once a burst of changes is over"""
+        if self.desktop_reload_timeout:
+            GLib.source_remove(self.desktop_reload_timeout)
+        self.desktop_reload_timeout = GLib.timeout_add(500, self.reload_desktop_entries)
+    
+    def reload_desktop_entries(self, force=True):
+        """Rescan .desktop files in a worker; the result is applied on the main loop"""
+        self.desktop_reload_timeout = None
+        self.jobs.submit('desktop-entries', DesktopEntryIndex.load, force,
+                         on_done=self.on_desktop_entries_loaded, timeout=DESKTOP_SCAN_TIMEOUT)
+        return False
+    
+    def on_desktop_entries_loaded(self, index, error):
+        if error:
+            print(f"⚠️  Error leyendo los .desktop: {error}")
+            return
+        self.parser.desktop_entries = index
+        self.parser.desktop_entries_stale = False
+        # Las palabras clave de la búsqueda y los planes de gtk-launch
+        # dependen de los .desktop; los ids del índice no cambian
+        self.parser.apply_desktop_entries(self.applications)
+        # Repetir la consulta visible (si hay una pendiente, ya usará el índice nuevo)
+        if self.search_entry and self.search_entry.get_text() and not self.search_source:
+            self.run_search()
+        return False
+    
     def apply_css(self):
         """Loads and applies CSS from the configuration."""
         # Verificar si debe usar tema GTK
         use_gtk_theme = self.config['colors'].get('use_gtk_theme', False)
         
+        # Todas las reglas van bajo #pymenu / .menu-window para que solo
+        # coincidan con nuestros widgets y no con cada botón de la pantalla
         if use_gtk_theme:
             # Si usa tema GTK, usar un fondo sólido compatible
             css = """
-            GtkWindow, GtkEventBox {
+            #pymenu, .menu-window eventbox {
                 background-color: @theme_bg_color;
                 border-radius: 0px;
                 box-shadow: none;
@@ -856,13 +2663,13 @@ class ArcMenuLauncher(Gtk.Window):
             colors = self.config['colors']
             
             css = f"""
-            GtkWindow, GtkEventBox {{
+            #pymenu, .menu-window eventbox {{
                 background-color: {colors['background']};
                 border-radius: 0px;
                 box-shadow: none;
                 border: none;
             }}
-            .tooltip, tooltip, GtkTooltip {{
+            tooltip {{
                 background-color: {colors['background']};
                 color: {colors['text_normal']};
                 border-radius: 8px;
@@ -878,11 +2685,11 @@ class ArcMenuLauncher(Gtk.Window):
                 padding: 5px 10px 10px 10px;
             }}
         
-            listbox {{
+            .menu-window listbox {{
                 padding: 2px;
             }}
             
-            listbox row {{
+            .menu-window listbox row {{
                 background-color: {self.config['colors'].get('categories_background', 'rgba(0,0,0,0.4)')};
                 color: {self.config['colors']['text_normal']};
                 border-radius: 6px;
@@ -891,55 +2698,55 @@ class ArcMenuLauncher(Gtk.Window):
                 min-height: 26px;
             }}
         
-            listbox row:selected {{
+            .menu-window listbox row:selected {{
                 background-color: {colors['selected_background']};
                 color: {colors['selected_text']};
             }}
         
-            listbox row:hover {{
+            .menu-window listbox row:hover {{
                 background-color: {colors['hover_background']};
             }}
         
-            button {{
+            .menu-window button {{
                 border-radius: 8px;
                 padding: 2px 2px;
                 background-color: {colors['button_normal_background']};
                 color: {colors['button_text']};
                 border: none;
             }}
-            .action-button {{
+            .menu-window .action-button {{
                 border-radius: 6px;
                 background-color: {colors['button_normal_background']};
                 color: {colors['text_normal']};
                 border: 1px solid {colors['button_normal_background']};
             }}
-            .action-button:hover {{
+            .menu-window .action-button:hover {{
                 background-color: {colors['hover_background']};
             }}
             
-            listbox row.selected-category {{
+            .menu-window listbox row.selected-category {{
                 background-color: {colors['selected_background']};
                 color: {colors['selected_text']};
             }}
         
-            button:hover {{
+            .menu-window button:hover {{
                 background-color: {colors['hover_background']};
             }}       
-            .search-box:focus {{
+            .menu-window .search-box:focus {{
             background-color: {colors['button_normal_background']};
             color: {colors['text_normal']};
             border: 1px solid {colors['border']} ;
             border-radius: 8px;
             }}
-            .app-box {{
+            .menu-window .app-box {{
                 min-width: {self.icon_size + 0}px;
             }}
-            .category-list {{
+            .menu-window .category-list {{
                  background-color: {colors['categories_background']};
                  padding: 1px;
                  border-radius: 12px;
             }}
-            menuitem {{
+            .pymenu-context menuitem {{
                 background-color: {colors['background']};
                 color: {colors['text_normal']};
                 border-radius: 8px;
@@ -948,39 +2755,39 @@ class ArcMenuLauncher(Gtk.Window):
                 box-shadow: 0px 2px 5px rgba(0, 0, 0, 0.2);
             }}
             
-            menuitem:hover {{
+            .pymenu-context menuitem:hover {{
                 background-color: {colors['hover_background']};
                 color: {colors['text_normal']};
             }}
             
-            menuitem:selected {{
+            .pymenu-context menuitem:selected {{
                 background-color: {colors['hover_background']};
                 color: {colors['text_normal']};
             }}
-            .quick-access-button {{
+            .menu-window .quick-access-button {{
                 padding: 5px;
                 margin: 2px;
             }}
-            .quick-access-button:hover {{
+            .menu-window .quick-access-button:hover {{
                 background-color: {colors['hover_background']};
             }}
-            #quick-access-icon {{
+            .menu-window #quick-access-icon {{
                 font-size: 18pt;
             }}
-            .social-button {{
+            .menu-window .social-button {{
                 padding: 5px;
                 margin: 2px;
                 border-radius: 8px;
                 background-color: {colors['button_normal_background']};
             }}
-            .social-button:hover {{
+            .menu-window .social-button:hover {{
                 background-color: {colors['hover_background']};
             }}
-            #social-icon {{
+            .menu-window #social-icon {{
                 font-size: 16pt;
                 color: {colors['text_normal']};
             }}
-            button.profile-circular-style {{
+            .menu-window button.profile-circular-style {{
                 /* Esto hace que el botón sea circular */
                 border-radius: 50%;
                 padding: 0; 
@@ -989,7 +2796,7 @@ class ArcMenuLauncher(Gtk.Window):
                 min-height: 64px;
             }}
             
-            button.profile-circular-style:hover {{
+            .menu-window button.profile-circular-style:hover {{
                 /* Esto define el efecto HOVER circular */
                 background-color: rgba(255, 255, 255, 0.1);
                 box-shadow: none;
@@ -997,13 +2804,16 @@ class ArcMenuLauncher(Gtk.Window):
             """
             print("Using custom colors")
         
-        style_provider = Gtk.CssProvider()
-        style_provider.load_from_data(css.encode('utf-8'))
-        Gtk.StyleContext.add_provider_for_screen(
-            Gdk.Screen.get_default(),
-            style_provider,
-            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-        )
+        # Un solo provider por lanzador: se registra en la pantalla una vez y
+        # en cada recarga solo se reemplaza su contenido (un único restyle)
+        if self.css_provider is None:
+            self.css_provider = Gtk.CssProvider()
+            Gtk.StyleContext.add_provider_for_screen(
+                Gdk.Screen.get_default(),
+                self.css_provider,
+                Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+            )
+        self.css_provider.load_from_data(css.encode('utf-8'))
 
     def on_jwm_file_changed(self, monitor, file, other_file, event_type):
         """Reload the menu when the JWM file is modified"""
@@ -1050,12 +2860,11 @@ class ArcMenuLauncher(Gtk.Window):
                                 break
                     break
             else:
-                result = subprocess.run(['uname', '-sr'], capture_output=True, text=True)
-                if result.returncode == 0:
-                    os_name = result.stdout.strip()
+                uname = os.uname()
+                os_name = f"{uname.sysname} {uname.release}"
             
-            result = subprocess.run(['uname', '-r'], capture_output=True, text=True)
-            kernel = result.stdout.strip() if result.returncode == 0 else "Unknown"
+            # os.uname() evita lanzar un proceso 'uname' al construir el header
+            kernel = os.uname().release or "Unknown"
             
             return os_name, kernel
             
@@ -1145,6 +2954,8 @@ class ArcMenuLauncher(Gtk.Window):
         self.connect("focus-out-event", self.on_focus_out)
         self.connect("button-press-event", self.on_button_press)
         self.connect("configure-event", self.on_size_changed)
+        self.add_events(Gdk.EventMask.POINTER_MOTION_MASK)
+        self.connect("motion-notify-event", self.on_pointer_motion)
         self.show_all()
         self.present()
         self.grab_focus()
@@ -1171,10 +2982,23 @@ class ArcMenuLauncher(Gtk.Window):
         return False
  
     def on_key_press(self, widget, event):
-        """Close window with Escape key"""
+        """Close window with Escape key and send typing to the search entry"""
         if event.keyval == Gdk.KEY_Escape:
             Gtk.main_quit()
             return True
+        
+        # Antes de que la búsqueda tenga el foco (o desde la cuadrícula),
+        # solo el texto imprimible se reenvía a la barra de búsqueda: flechas,
+        # Inicio/Fin, Enter y espacio siguen siendo de la cuadrícula
+        if self.search_entry and not self.search_entry.has_focus():
+            char = chr(Gdk.keyval_to_unicode(event.keyval) or 0)
+            modifiers = event.state & (Gdk.ModifierType.CONTROL_MASK | Gdk.ModifierType.MOD1_MASK)
+            if not char.isprintable() or char.isspace() or modifiers:
+                return False
+            if self.search_entry.handle_event(event):
+                self.search_entry.grab_focus_without_selecting()
+                self.search_entry.set_position(-1)
+                return True
         return False
     
     def on_focus_out(self, widget, event):
@@ -1205,7 +3029,7 @@ class ArcMenuLauncher(Gtk.Window):
             return favorites_list            
                     
     def create_interface(self):
-        """Create the main interface"""
+        """Create the main interface: a skeleton first, then the sidebars in idle stages"""
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
         main_box.get_style_context().add_class('menu-window')
         self.add(main_box)
@@ -1213,9 +3037,10 @@ class ArcMenuLauncher(Gtk.Window):
         top_spacer.set_size_request(-1, 2)  # 20 píxeles de altura
         main_box.pack_start(top_spacer, False, False, 0)
     
-        if not self.config['window'].get('hide_header', False):
-            header_box = self.create_header()
-            main_box.pack_start(header_box, False, False, 0)
+        # Huecos vacíos que se rellenan después del primer frame, así la
+        # ventana (con la búsqueda) se muestra sin esperar a las columnas
+        header_slot = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+        main_box.pack_start(header_slot, False, False, 0)
             
  #           main_box.pack_start(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL), False, False, 0)
   
@@ -1224,20 +3049,16 @@ class ArcMenuLauncher(Gtk.Window):
         main_box.pack_start(content_box, True, True, 0)
     
         # Columna 1: Places (Lugares) - nueva columna
-        if not self.config['window'].get('hide_places', False):
-            places_sidebar = self.create_places_sidebar()
-            content_box.pack_start(places_sidebar, False, False, 0)
-            content_box.pack_start(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL), False, False, 0)
+        places_slot = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        content_box.pack_start(places_slot, False, False, 0)
         
         # Columna 2: Redes sociales (solo si no están ocultas en la config)
-        if not self.config['window'].get('hide_social_networks', False):
-            social_sidebar = self.create_social_networks_sidebar()
-            content_box.pack_start(social_sidebar, False, False, 0)
-            content_box.pack_start(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL), False, False, 0)
+        social_slot = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        content_box.pack_start(social_slot, False, False, 0)
         
         # Columna 3: Categorías
-        content_box.pack_start(self.create_categories_sidebar(), False, False, 0)
-        content_box.pack_start(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL), False, False, 0)
+        categories_slot = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        content_box.pack_start(categories_slot, False, False, 0)
         
 # Columna 4: Aplicaciones
         apps_area = self.create_applications_area()
@@ -1271,6 +3092,50 @@ class ArcMenuLauncher(Gtk.Window):
         self.show_all()
         GLib.timeout_add(100, self.delayed_focus_grab)
         
+        # Etapas en orden de prioridad: (hueco, constructor, separador)
+        stages = [(categories_slot, self.create_categories_sidebar, True)]
+        if not self.config['window'].get('hide_places', False):
+            stages.append((places_slot, self.create_places_sidebar, True))
+            stages.append((None, self.add_favorites_section, False))
+        if not self.config['window'].get('hide_header', False):
+            stages.append((header_slot, self.create_header, False))
+        if not self.config['window'].get('hide_social_networks', False):
+            stages.append((social_slot, self.create_social_networks_sidebar, True))
+        self.start_progressive_build(stages)
+        
+    def start_progressive_build(self, stages):
+        """Build the remaining parts of the interface one idle slice at a time"""
+        if self.build_source:
+            GLib.source_remove(self.build_source)
+        self.build_stages = list(stages)
+        self.build_started = time.monotonic()
+        self.build_source = GLib.idle_add(self.progressive_build_step)
+        
+    def start_deferred_jobs(self):
+        """Startup work that must not delay the first frame nor a click"""
+        # El primer which() del clic ya no recorre todo el PATH en el hilo de GTK
+        self.jobs.submit('path-index', self.path_index.refresh, timeout=5)
+        self.jobs.submit('urxvtd', self.terminal_server.warm, timeout=3)
+        
+    def progressive_build_step(self):
+        """Run one build stage; when all are done start prebuilding categories"""
+        if not self.build_stages:
+            self.build_source = None
+            profile_log("Interface fully built", self.build_started)
+            self.start_prebuild()
+            self.prefetch_frequent_apps()
+            self.start_deferred_jobs()
+            return False
+        
+        slot, factory, separator = self.build_stages.pop(0)
+        widget = factory()
+        if slot is not None and widget is not None:
+            slot.pack_start(widget, True, True, 0)
+            if separator:
+                slot.pack_start(Gtk.Separator(orientation=Gtk.Orientation.VERTICAL), False, False, 0)
+            slot.show_all()
+        return True
+        
     def create_search_and_buttons_box(self):
         """Crea la caja con barra de búsqueda y botones de acción"""
         bottom_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=10)
@@ -1283,7 +3148,9 @@ class ArcMenuLauncher(Gtk.Window):
         self.search_entry.get_style_context().add_class('search-box')
         
         self.search_entry.set_placeholder_text(TR['Search applications...'])
-        self.search_entry.connect("search-changed", self.on_search_changed)
+        # "changed" en vez de "search-changed": el debounce lo hace on_search_changed
+        self.search_entry.connect("changed", self.on_search_changed)
+        self.search_entry.connect("key-press-event", self.on_search_key_press)
         self.search_entry.set_size_request(200, 10)
         self.search_entry.set_can_focus(True)
         self.search_entry.set_tooltip_text(TR['Search applications...'])
@@ -1421,7 +3288,7 @@ class ArcMenuLauncher(Gtk.Window):
             profile_manager_path = self.config['paths'].get('profile_manager', "")
             if profile_manager_path: # Solo intenta ejecutar si NO está vacío
                 try:
-                    GLib.timeout_add(100, lambda: Gtk.main_quit())
+                    self.hide_for_launch()
                     # Verificamos si es un script ejecutable o requiere python3
                     if os.access(profile_manager_path, os.X_OK):
                         subprocess.Popen([profile_manager_path])
@@ -1429,6 +3296,8 @@ class ArcMenuLauncher(Gtk.Window):
                         subprocess.Popen(["python3", profile_manager_path])
                 except Exception as e:
                     print(f"Error: {e}")
+                finally:
+                    self.exit_after_launch("profile manager")
             else:
                 print("Profile Manager no configurado por el usuario.")
         
@@ -1648,18 +3517,7 @@ class ArcMenuLauncher(Gtk.Window):
         
         # 2. LUGARES DEL SISTEMA (Home, Downloads, etc.) - FILTRADOS POR CONFIGURACIÓN
         # Diccionario de carpetas disponibles con sus íconos y rutas
-        all_system_places = {
-            'Home': ('user-home', TR.get('Home', 'Home'), '~'),
-            'Downloads': ('folder-download', TR.get('Downloads', 'Downloads'), f"~/{TR.get('DownloadsDir', 'Downloads')}"),
-            'Documents': ('folder-documents', TR.get('Documents', 'Documents'), f"~/{TR.get('DocumentsDir', 'Documents')}"),
-            'Music': ('folder-music', TR.get('Music', 'Music'), f"~/{TR.get('MusicDir', 'Music')}"),
-            'Pictures': ('folder-pictures', TR.get('Pictures', 'Pictures'), f"~/{TR.get('PicturesDir', 'Pictures')}"),
-            'Videos': ('folder-videos', TR.get('Videos', 'Videos'), f"~/{TR.get('VideosDir', 'Videos')}"),
-            'Desktop': ('user-desktop', TR.get('Desktop', 'Desktop'), '~/Desktop'),
-            'Templates': ('folder-templates', TR.get('Templates', 'Templates'), '~/Templates'),
-            'Public': ('folder-publicshare', TR.get('Public', 'Public'), '~/Public'),
-            'Recent': ('document-open-recent', TR.get('Recent', 'Recent'), '~/.local/share/recently-used.xbel')
-        }
+        all_system_places = self.get_system_places()
         
         # Obtener lista de carpetas visibles desde la configuración
         visible_folders = self.config.get('places', {}).get('visible_folders', ["Home", "Downloads", "Documents", "Music", "Pictures", "Videos"])
@@ -1695,9 +3553,84 @@ class ArcMenuLauncher(Gtk.Window):
                 hbox.pack_start(text_label, True, True, 0)
                 
                 btn.add(hbox)
-                btn.connect("clicked", lambda b, p=path: open_directory(p))
+                if folder_key == 'Recent':
+                    # Mostrar los documentos recientes en el área de aplicaciones
+                    btn.connect("clicked", lambda b: self.show_recent_files())
+                else:
+                    btn.connect("clicked", lambda b, p=path: open_directory(p))
                 places_box.pack_start(btn, False, False, 0)
         
+        # 3. Los favoritos se agregan en una etapa posterior (add_favorites_section)
+        self.places_box = places_box
+        self.places_font_desc = font_desc
+        
+        # Scroll automático
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.add(places_box)
+        
+        return scrolled
+    
+    def get_system_places(self):
+        """Carpetas disponibles para Places: clave -> (icono, etiqueta, ruta)"""
+        return {
+            'Home': ('user-home', TR.get('Home', 'Home'), '~'),
+            'Downloads': ('folder-download', TR.get('Downloads', 'Downloads'), f"~/{TR.get('DownloadsDir', 'Downloads')}"),
+            'Documents': ('folder-documents', TR.get('Documents', 'Documents'), f"~/{TR.get('DocumentsDir', 'Documents')}"),
+            'Music': ('folder-music', TR.get('Music', 'Music'), f"~/{TR.get('MusicDir', 'Music')}"),
+            'Pictures': ('folder-pictures', TR.get('Pictures', 'Pictures'), f"~/{TR.get('PicturesDir', 'Pictures')}"),
+            'Videos': ('folder-videos', TR.get('Videos', 'Videos'), f"~/{TR.get('VideosDir', 'Videos')}"),
+            'Desktop': ('user-desktop', TR.get('Desktop', 'Desktop'), '~/Desktop'),
+            'Templates': ('folder-templates', TR.get('Templates', 'Templates'), '~/Templates'),
+            'Public': ('folder-publicshare', TR.get('Public', 'Public'), '~/Public'),
+            'Recent': ('document-open-recent', TR.get('Recent', 'Recent'), '~/.local/share/recently-used.xbel')
+        }
+    
+    def create_search_providers(self):
+        """Proveedores extra de la búsqueda, según la configuración"""
+        enabled = self.config.get('search_providers', {})
+        providers = []
+        if enabled.get('places', True):
+            visible = self.config.get('places', {}).get('visible_folders', [])
+            places = self.get_system_places()
+            providers.append(PlacesProvider([(places[key][1], places[key][2], places[key][0])
+                                             for key in visible
+                                             if key in places and key != 'Recent']))
+        if enabled.get('favorites', True):
+            providers.append(FavoritesProvider(self.config.get('favorites', [])))
+        if enabled.get('recent', True):
+            providers.append(self.recent_provider)
+        if enabled.get('commands', True):
+            providers.append(PathCommandsProvider(self.path_index))
+        return providers
+    
+    def show_recent_files(self):
+        """Read recent files in the JobRunner, then show them in the apps area"""
+        self.jobs.submit('recent-files', self.recent_provider.recent,
+                         on_done=self.on_recent_files, timeout=SEARCH_PROVIDER_TIMEOUT_MS / 1000.0)
+    
+    def on_recent_files(self, items, error):
+        if error:
+            print(f"Error leyendo archivos recientes: {error}")
+            return
+        self.show_recent_view([path for stamp, path, key in items[:RECENT_FILES_SHOWN]])
+    
+    def show_recent_view(self, paths):
+        if not self.apps_flowbox:
+            return False
+        self.clear_apps_view("__recent__")
+        for path in paths:
+            self.add_app_child("__recent__", self.recent_provider.to_result(path))
+        self.set_apps_view("__recent__")
+        return False
+    
+    def add_favorites_section(self):
+        """Agregar separador y favoritos a la columna de Places (etapa diferida)"""
+        places_box = self.places_box
+        font_desc = self.places_font_desc
+        if places_box is None:
+            return None
+        
         # 3. SEPARADOR Y FAVORITOS
         places_box.pack_start(Gtk.Separator(orientation=Gtk.Orientation.HORIZONTAL), False, False, 5)
         
@@ -1929,12 +3862,8 @@ class ArcMenuLauncher(Gtk.Window):
             
             places_box.pack_start(favorites_event_box, False, False, 0)
         
-        # Scroll automático
-        scrolled = Gtk.ScrolledWindow()
-        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scrolled.add(places_box)
-        
-        return scrolled
+        places_box.show_all()
+        return None
     
     def on_favorites_section_hover_enter(self, widget, event):
         """Muestra los favoritos en la columna de aplicaciones al pasar el mouse sobre la sección"""
@@ -1954,10 +3883,11 @@ class ArcMenuLauncher(Gtk.Window):
         if not favorites:
             return False
         
-        # Limpiar la columna de aplicaciones
-        if self.apps_flowbox:
-            for child in self.apps_flowbox.get_children():
-                child.destroy()
+        if not self.apps_flowbox:
+            return False
+        
+        # Los favoritos se releen del JSON, así que su vista se reconstruye
+        self.clear_apps_view("__favorites__")
         
         # Convertir favoritos al formato de aplicación
         fav_apps = []
@@ -1974,10 +3904,9 @@ class ArcMenuLauncher(Gtk.Window):
         
         # Mostrar favoritos en la columna de aplicaciones
         for app_info in fav_apps:
-            button = self.create_app_button(app_info)
-            self.apps_flowbox.add(button)
+            self.add_app_child("__favorites__", app_info)
         
-        self.apps_flowbox.show_all()
+        self.set_apps_view("__favorites__")
         return False
     
     def on_favorites_section_hover_leave(self, widget, event):
@@ -2010,8 +3939,7 @@ class ArcMenuLauncher(Gtk.Window):
                                         break
                             break
     
-                subprocess.Popen(clean_cmd, shell=True, start_new_session=True,
-                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                spawn_command(clean_cmd, path_index=self.path_index)
                 self.hide() # En tu clase 'self' es la ventana
             except Exception as e:
                 print(f"Error: {e}")
@@ -2074,13 +4002,15 @@ class ArcMenuLauncher(Gtk.Window):
             profile_manager_path = self.config['paths'].get('profile_manager', "")
             if profile_manager_path:
                 try:
-                    GLib.timeout_add(100, lambda: Gtk.main_quit())
+                    self.hide_for_launch()
                     if os.access(profile_manager_path, os.X_OK):
                         subprocess.Popen([profile_manager_path])
                     else:
                         subprocess.Popen(["python3", profile_manager_path])
                 except Exception as e:
                     print(f"Error: {e}")
+                finally:
+                    self.exit_after_launch("profile manager")
             else:
                 print("Profile Manager no configurado por el usuario.")
         
@@ -2148,6 +4078,7 @@ class ArcMenuLauncher(Gtk.Window):
         self.categories_listbox.get_style_context().add_class('category-list')
         self.categories_listbox.set_selection_mode(Gtk.SelectionMode.NONE)
         self.categories_listbox.connect("row-activated", self.on_category_clicked)
+        self.category_order = []
     
         category_icons = {
             'Desktop': 'pc48',            
@@ -2167,6 +4098,7 @@ class ArcMenuLauncher(Gtk.Window):
             'Shutdown': 'shutdown48',           # Suponiendo que tengas un 'shutdown48.png'
              'Rectify': 'save48',
              'Leave': 'shutdown48',
+             'Frequent': 'favorites48',
         }
     
         preferred_order = ['Desktop', 'System', 'Setup', 'Utility', 'Filesystem', 
@@ -2177,14 +4109,23 @@ class ArcMenuLauncher(Gtk.Window):
         excluded_categories = self.config.get('categories', {}).get('excluded', [])
         
         added_categories = set()
+        
+        # Pseudo-categoría opcional con las apps más usadas (frecencia)
+        if (self.config.get('categories', {}).get('show_frequent', False)
+                and self.launch_history.top(1)):
+            self.add_category_row("Frequent", category_icons['Frequent'])
+            self.category_order.append("Frequent")
+        
         for category in preferred_order:
             if category in self.applications and self.applications[category] and category not in excluded_categories:
                 self.add_category_row(category, category_icons.get(category, 'applications-other'))
                 added_categories.add(category)
+                self.category_order.append(category)
         
         for category in sorted(self.applications.keys()):
             if category not in added_categories and self.applications[category] and category not in excluded_categories:
                 self.add_category_row(category, category_icons.get(category, 'applications-other'))
+                self.category_order.append(category)
     
         scrolled.add(self.categories_listbox)
     
@@ -2289,6 +4230,8 @@ class ArcMenuLauncher(Gtk.Window):
         if not category:
             return False
         
+        self.hover_intent.add_sample(event.x_root, event.y_root, event.time)
+        
         # Si ya estamos en esta categoría Y NO mostrando favoritos, no hacer nada
         if category == self.current_category and not self.showing_favorites:
             return False
@@ -2307,20 +4250,82 @@ class ArcMenuLauncher(Gtk.Window):
             GLib.source_remove(self.restore_timeout)
             self.restore_timeout = None
         
-        # PASO 3: NUEVO - Programar activación con delay de 300ms
-        # Esto da tiempo para que el mouse "pase de largo" sin activar la categoría
-        def activate_category():
+        # PASO 3: Decidir según la intención del puntero en lugar de un
+        # retraso fijo: inmediato si está quieto o lento, esperar si apunta
+        # hacia las aplicaciones o barre rápido sobre la lista
+        self.pending_hover_category = category
+        self.hover_started = time.monotonic()
+        self.schedule_hover_activation(self.hover_activation_delay())
+        
+        return False
+    
+    def hover_activation_delay(self):
+        """Milliseconds to wait before activating the hovered category (0 = now)"""
+        hover_config = self.config.get('hover', {})
+        if self.hover_intent.is_aiming(self.apps_area_rect()):
+            return hover_config.get('aim_delay_ms', 300)
+        if self.hover_intent.speed() > hover_config.get('sweep_speed', 0.8):
+            return hover_config.get('rest_delay_ms', 40)
+        return 0
+    
+    def schedule_hover_activation(self, delay):
+        if self.hover_timeout:
+            GLib.source_remove(self.hover_timeout)
             self.hover_timeout = None
-            self.showing_favorites = False
-            self.hovered_category = category
-            self.current_category = category
-            self.show_category_applications(category)
+        if delay <= 0:
+            self.activate_hovered_category()
+        else:
+            self.hover_timeout = GLib.timeout_add(delay, self.activate_hovered_category)
+    
+    def activate_hovered_category(self):
+        """Show the pending hovered category and measure the perceived switch latency"""
+        self.hover_timeout = None
+        category = self.pending_hover_category
+        self.pending_hover_category = None
+        if not category:
             return False
         
-        # Solo activar después de 300ms de estar sobre la categoría
-        self.hover_timeout = GLib.timeout_add(250, activate_category)
+        self.showing_favorites = False
+        self.hovered_category = category
+        self.current_category = category
+        self.show_category_applications(category)
+        if self.hover_started is not None:
+            self.measure_switch_latency(category, self.hover_started)
+        return False
+    
+    def measure_switch_latency(self, category, started):
+        """Log time from pointer entering the row to the frame showing the new category"""
+        clock = self.get_frame_clock()
+        if not PROFILE or clock is None:
+            return
+        
+        def after_paint(frame_clock):
+            frame_clock.disconnect(handler_id)
+            profile_log(f"Category switch '{category}'", started)
         
+        handler_id = clock.connect("after-paint", after_paint)
+    
+    def on_pointer_motion(self, widget, event):
+        """Track pointer velocity/direction for intent-aware category hover"""
+        self.hover_intent.add_sample(event.x_root, event.y_root, event.time)
+        
+        # Mientras una categoría espera: si el puntero ya no apunta a las
+        # aplicaciones, activarla en cuanto se detenga (rest_delay_ms)
+        if self.pending_hover_category and not self.hover_intent.is_aiming(self.apps_area_rect()):
+            self.schedule_hover_activation(self.config.get('hover', {}).get('rest_delay_ms', 40))
         return False
+    
+    def apps_area_rect(self):
+        """Screen rectangle (x, y, w, h) of the applications area, or None"""
+        toplevel = self.get_window()
+        if not self.apps_scrolled or toplevel is None:
+            return None
+        coords = self.apps_scrolled.translate_coordinates(self, 0, 0)
+        if not coords:
+            return None
+        origin = toplevel.get_origin()
+        alloc = self.apps_scrolled.get_allocation()
+        return (origin[-2] + coords[0], origin[-1] + coords[1], alloc.width, alloc.height)
         
     def _cleanup_favorites_state(self):
         """Función de limpieza para el estado de favoritos"""
@@ -2335,6 +4340,7 @@ class ArcMenuLauncher(Gtk.Window):
             GLib.source_remove(self.hover_timeout)
             self.hover_timeout = None
             
+        self.pending_hover_category = None
         self.hovered_category = None
         return False
 
@@ -2348,6 +4354,7 @@ class ArcMenuLauncher(Gtk.Window):
             if self.hover_timeout:
                 GLib.source_remove(self.hover_timeout)
                 self.hover_timeout = None
+            self.pending_hover_category = None
         
             if self.selected_category_row:
                 self.selected_category_row.get_style_context().remove_class("selected-category")
@@ -2406,6 +4413,7 @@ class ArcMenuLauncher(Gtk.Window):
             # Área de aplicaciones con scroll
             scrolled = Gtk.ScrolledWindow()
             scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            self.apps_scrolled = scrolled
             
             self.apps_flowbox = Gtk.FlowBox()
             self.apps_flowbox.set_valign(Gtk.Align.START)
@@ -2415,6 +4423,19 @@ class ArcMenuLauncher(Gtk.Window):
             self.apps_flowbox.set_property("margin-right", 5)
             self.apps_flowbox.set_property("margin-top", 10)
             self.apps_flowbox.set_property("margin-bottom", 10)
+            self.apps_flowbox.set_filter_func(self.apps_filter_func)
+            self.apps_flowbox.set_sort_func(self.apps_sort_func)
+            
+            # Nuevo FlowBox: olvidar las vistas construidas para el anterior
+            self.cancel_prebuild()
+            self.category_children = {}
+            self.category_built = {}
+            self.category_loading = {}
+            self.visible_category = None
+            self.cancel_search_materialize()
+            self.entry_children = {}
+            self.search_matches = set()
+            self.search_rank = {}
             
             apps_eventbox = Gtk.EventBox()
             apps_eventbox.add(self.apps_flowbox)
@@ -2422,6 +4443,7 @@ class ArcMenuLauncher(Gtk.Window):
             apps_eventbox.connect("enter-notify-event", self.on_apps_area_enter)
             
             self.apps_flowbox.connect("key-press-event", self.on_apps_key_press)
+            self.apps_navigator = AppGridNavigator(self.apps_flowbox, scrolled)
             
             scrolled.add(apps_eventbox)
             main_container.pack_start(scrolled, True, True, 0)
@@ -2472,6 +4494,9 @@ class ArcMenuLauncher(Gtk.Window):
         button.set_can_focus(True)
         button.set_relief(Gtk.ReliefStyle.NONE)
         button.connect("clicked", self.on_app_clicked, app_info)
+        button.connect("enter-notify-event", lambda w, e: self.schedule_prefetch(app_info))
+        button.connect("leave-notify-event", lambda w, e: self.cancel_prefetch())
+        button.connect("focus-in-event", lambda w, e: self.prefetch_app(app_info))
         
         # Contenedor vertical para ícono y nombre
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
@@ -2516,12 +4541,18 @@ class ArcMenuLauncher(Gtk.Window):
                 self.context_menu_active = True
                 
                 menu = Gtk.Menu()
+                menu.get_style_context().add_class('pymenu-context')
                 
                 # Opción ejecutar
                 item_run = Gtk.MenuItem(label=TR['Run'])
                 item_run.connect("activate", lambda w: self.on_app_clicked(button, app_info))
                 menu.append(item_run)
                 
+                # Opción ejecutar en terminal (comandos escritos en la búsqueda, herramientas de consola)
+                item_terminal = Gtk.MenuItem(label=TR.get('Run in terminal', 'Run in terminal'))
+                item_terminal.connect("activate", lambda w: self.on_app_clicked(button, app_info, terminal=True))
+                menu.append(item_terminal)
+                
                 # Separador
                 separator = Gtk.SeparatorMenuItem()
                 menu.append(separator)
@@ -2689,83 +4720,255 @@ class ArcMenuLauncher(Gtk.Window):
                     print(f"Error cargando favoritos: {e}")
             return []              
     
-    def show_all_applications(self):
-            """Muestra favoritos con sus nombres reales y luego el resto de apps"""
-            if not self.apps_flowbox:
-                return
-            
-            self.current_category = "All"
-            
-            # Limpiar iconos actuales
-            for child in self.apps_flowbox.get_children():
-                child.destroy()
-            
-            # --- CARGAR FAVORITOS ---
-            favorites = self.get_favorites()
-            for fav in favorites:
-                # IMPORTANTE: Mapear exactamente las llaves del JSON a lo que el menú usa
-                fav_info = {
-                    "Name": fav.get('name', 'Sin nombre'), # Toma el nombre del configurador
-                    "Exec": fav.get('exec', ''),           # Toma el comando
-                    "Icon": fav.get('icon', 'exec'),       # Toma el icono
-                    "is_favorite": True
-                }
-                
-                # Llamamos a tu función de crear item con el nombre real
-                item = self.create_app_item(fav_info["Name"], fav_info)
-                if item:
-                    self.apps_flowbox.add(item)
-            
-            # --- CARGAR EL RESTO DE APPS ---
-            GLib.idle_add(self.load_applications_batch, list(self.applications.items()), 0)
-            
-            self.apps_flowbox.show_all()
-    
     def show_category_applications(self, category):
-        """Show applications from specific category with lazy loading"""
+        """Show applications from specific category, reusing its cached view"""
         if not self.apps_flowbox:
             return
         
         self.current_category = category
-        
-        # Limpiar apps actuales
-        for child in self.apps_flowbox.get_children():
-            child.destroy()
-        
-        if category in self.applications:
-            apps_data = [(category, self.applications[category])]
-            GLib.idle_add(self.load_applications_batch, apps_data, 0)
-        
-        self.apps_flowbox.show_all()
+        if category == "Frequent" and category not in self.category_children:
+            for app in self.frequent_applications():
+                self.add_app_child(category, app)
+        self.set_apps_view(category)
+        
+        # Si la vista aún no está completa, terminarla por lotes
+        apps = self.applications.get(category, [])
+        if self.category_built.get(category, 0) < len(apps) and not self.category_loading.get(category):
+            self.category_loading[category] = True
+            GLib.idle_add(self.load_applications_batch, category)
+    
+    def frequent_applications(self):
+        """Apps of the menu with the highest frecency, best first"""
+        index = self.parser.search_index
+        first_entry = {}
+        for entry_id, app_id in enumerate(index.app_ids):
+            first_entry.setdefault(app_id, entry_id)
+        return [index.apps[first_entry[app_id]]
+                for app_id in self.launch_history.top(FREQUENT_LIMIT * 2)
+                if app_id in first_entry][:FREQUENT_LIMIT]
     
-    def load_applications_batch(self, apps_data, start_index, batch_size=10):
+    def load_applications_batch(self, category, batch_size=10):
         """Load applications in batches to avoid UI freezing"""
-        count = 0
-        
-        for category, apps in apps_data:
-            for i, app in enumerate(apps[start_index:], start_index):
-                if count >= batch_size:
-                    GLib.idle_add(self.load_applications_batch, [(category, apps)], i)
-                    return False
-                
-                button = self.create_app_button(app)
-                self.apps_flowbox.add(button)
-                count += 1
+        if self.build_category_apps(category, batch_size):
+            return True
+        self.category_loading[category] = False
+        return False
+    
+    def build_category_apps(self, category, limit):
+        """Build up to `limit` pending buttons of a category; True if more remain"""
+        apps = self.applications.get(category, [])
+        i = self.category_built.get(category, 0)
+        offset = self.parser.search_index.offsets.get(category)
+        built = 0
+        while i < len(apps) and built < limit:
+            if offset is None:
+                self.add_app_child(category, apps[i])
+                built += 1
+            elif offset + i not in self.entry_children:
+                # Los hijos de categoría se ordenan (y se buscan) por id del índice;
+                # los que ya creó una búsqueda se saltan
+                self.entry_children[offset + i] = self.add_app_child(category, apps[i], offset + i)
+                built += 1
+            i += 1
+        self.category_built[category] = i
+        return i < len(apps)
+    
+    def prefetch_app(self, app_info):
+        """Start reading an app's binary and libraries ahead of a likely launch"""
+        self.cancel_prefetch()
+        if self.config.get('hover', {}).get('prefetch_apps', True):
+            self.prefetcher.request(app_info.get('Launch') or launch_plan(app_info, self.parser.desktop_entries))
+        return False
+    
+    def schedule_prefetch(self, app_info):
+        """Prefetch once the pointer rests on an app button"""
+        self.cancel_prefetch()
+        delay = self.config.get('hover', {}).get('prefetch_delay_ms', 150)
+        self.prefetch_timeout = GLib.timeout_add(delay, self.on_prefetch_timeout, app_info)
+        return False
+    
+    def on_prefetch_timeout(self, app_info):
+        self.prefetch_timeout = None
+        return self.prefetch_app(app_info)
+    
+    def cancel_prefetch(self):
+        if self.prefetch_timeout:
+            GLib.source_remove(self.prefetch_timeout)
+            self.prefetch_timeout = None
+        return False
+    
+    def prefetch_frequent_apps(self):
+        """At menu open, warm the apps that are most likely to be launched"""
+        for app_info in self.frequent_applications()[:PREFETCH_TOP_APPS]:
+            self.prefetch_app(app_info)
+    
+    def add_app_child(self, key, app_info, search_id=None):
+        """Create an app button inside its own FlowBoxChild tagged with its view"""
+        child = Gtk.FlowBoxChild()
+        child.view_key = key
+        child.search_id = search_id
+        if search_id is None:
+            # Favoritos y otras vistas van después de todas las entradas del índice
+            self.extra_sort_key += 1
+            child.base_key = len(self.parser.search_index) + self.extra_sort_key
+        else:
+            child.base_key = search_id
+        # Los resultados de la búsqueda en curso llevan una clave negativa (su puesto)
+        child.sort_key = self.search_rank.get(search_id, child.base_key)
+        child.add(self.create_app_button(app_info))
+        # La selección con teclado enfoca el FlowBoxChild, no el botón
+        child.connect("focus-in-event", lambda w, e: self.prefetch_app(app_info))
+        child.show_all()
+        self.apps_flowbox.add(child)
+        children = self.category_children.setdefault(key, [])
+        if children and children[-1].base_key > child.base_key:
+            # Creado fuera de orden (por una búsqueda): mantener la lista en
+            # el orden de la vista para la navegación con teclado
+            position = bisect.bisect([c.base_key for c in children], child.base_key)
+            children.insert(position, child)
+        else:
+            children.append(child)
+        return child
+    
+    def clear_apps_view(self, key):
+        """Destroy the children of a rebuilt view (favorites)"""
+        for child in self.category_children.get(key, []):
+            child.destroy()
+        self.category_children[key] = []
+    
+    def set_apps_view(self, key):
+        """Show only the children of the given view; no widgets are created"""
+        if key != "__search__" and self.search_rank:
+            self.apply_search_order([])
+        self.visible_category = key
+        self.apps_flowbox.unselect_all()
+        self.apps_flowbox.invalidate_filter()
+        if self.apps_navigator:
+            self.apps_navigator.set_items(self.category_children.setdefault(key, []))
+    
+    def apps_filter_func(self, child):
+        """FlowBox filter: only the active view is visible"""
+        if self.visible_category == "__search__":
+            return (getattr(child, 'search_id', None) in self.search_matches
+                    or getattr(child, 'view_key', None) == "__search_extra__")
+        key = getattr(child, 'view_key', None)
+        if self.visible_category == "All":
+            return key in self.applications
+        return key == self.visible_category
+    
+    def apps_sort_func(self, child1, child2):
+        """FlowBox sort: search rank first, then parse order"""
+        return child1.sort_key - child2.sort_key
+    
+    def apply_search_order(self, ids):
+        """Move ranked results to the front; only the children that change are re-sorted"""
+        rank = {entry_id: position - len(ids) for position, entry_id in enumerate(ids)}
+        for entry_id in self.search_rank:
+            child = self.entry_children.get(entry_id)
+            if entry_id not in rank and child:
+                child.sort_key = child.base_key
+                child.changed()
+        for entry_id, key in rank.items():
+            child = self.entry_children.get(entry_id)
+            if child and child.sort_key != key:
+                child.sort_key = key
+                child.changed()
+        self.search_rank = rank
+    
+    def start_prebuild(self):
+        """Queue the remaining categories to be built while the menu is idle"""
+        self.cancel_prebuild()
+        self.prebuild_queue = [c for c in self.category_order
+                               if self.category_built.get(c, 0) < len(self.applications.get(c, []))]
+        if self.prebuild_queue:
+            self.prebuild_source = GLib.idle_add(self.prebuild_step, priority=GLib.PRIORITY_LOW)
+    
+    def cancel_prebuild(self):
+        if self.prebuild_source:
+            GLib.source_remove(self.prebuild_source)
+            self.prebuild_source = None
+        self.prebuild_queue = []
+    
+    def prebuild_step(self):
+        """Build category views (and their icons) within a small time budget per slice"""
+        deadline = time.monotonic() + PREBUILD_SLICE_MS / 1000.0
+        while self.prebuild_queue:
+            category = self.prebuild_queue[0]
+            if not self.build_category_apps(category, 1):
+                self.prebuild_queue.pop(0)
+            # Ceder de inmediato si hay eventos de entrada pendientes
+            if self.prebuild_queue and (Gtk.events_pending() or time.monotonic() >= deadline):
+                return True
         
-        self.apps_flowbox.show_all()
+        self.prebuild_source = None
         return False
     
+    def on_search_key_press(self, search_entry, event):
+        """Tab completes a bare command from the PATH index, like a shell"""
+        if event.keyval != Gdk.KEY_Tab or event.state & Gtk.accelerator_get_default_mod_mask():
+            return False
+        text = search_entry.get_text()
+        if not text or text != text.strip() or ' ' in text:
+            return False
+        matches = self.path_index.complete(text)
+        if not matches:
+            return True
+        completion = os.path.commonprefix(matches)
+        if len(matches) == 1:
+            completion += ' '
+        if completion != text:
+            search_entry.set_text(completion)
+            search_entry.set_position(-1)
+        return True
+
     def on_search_changed(self, search_entry):
-        """Handle search text change"""
+        """Coalesce keystrokes and schedule the search with an adaptive debounce"""
         if not self.apps_flowbox:
             return
-            
-        search_text = search_entry.get_text().lower()
         
-        for child in self.apps_flowbox.get_children():
-            child.destroy()
+        now = time.monotonic()
+        if self.search_last_key is not None:
+            interval = (now - self.search_last_key) * 1000
+            if interval < 500:
+                # Ritmo de tecleo (media móvil) durante una ráfaga
+                self.search_key_interval = 0.7 * self.search_key_interval + 0.3 * interval
+        self.search_last_key = now
+        if self.search_pending_since is None:
+            self.search_pending_since = now
+        
+        if self.search_source:
+            GLib.source_remove(self.search_source)
+            self.search_source = None
+        self.cancel_search_materialize()
+        
+        if not search_entry.get_text():
+            self.run_search()
+            return
+        
+        # Esperar algo más que el intervalo entre teclas, sin pasarse del
+        # objetivo de latencia contado desde la primera tecla de la ráfaga
+        waited = (now - self.search_pending_since) * 1000
+        budget = SEARCH_LATENCY_MS - self.search_cost - waited
+        delay = max(SEARCH_DEBOUNCE_MIN_MS, self.search_key_interval * 1.2)
+        delay = int(max(0, min(delay, budget)))
+        self.search_source = GLib.timeout_add(delay, self.run_search)
+    
+    def run_search(self):
+        """Apply the latest query: show its first results now, build the rest in idle slices"""
+        self.search_source = None
+        pending_since = self.search_pending_since or time.monotonic()
+        self.search_pending_since = None
+        if not self.apps_flowbox:
+            return False
+        
+        search_text = self.search_entry.get_text().lower()
+        
+        self.clear_apps_view("__search_extra__")
+        self.search_broker.submit(normalize_search_text(search_text))
         
         if not search_text:
+            self.search_matches = set()
+            self.apply_search_order([])
             if hasattr(self, 'current_category') and self.current_category:
                 self.show_category_applications(self.current_category)
             else:
@@ -2776,22 +4979,93 @@ class ArcMenuLauncher(Gtk.Window):
                     if cat in self.applications and self.applications[cat]:
                         self.show_category_applications(cat)
                         break
-            return
+            return False
         
-        for category, apps in self.applications.items():
-            for app in apps:
-                if (search_text in app['Name'].lower() or 
-                    search_text in app.get('Comment', '').lower()):
-                    button = self.create_app_button(app)
-                    self.apps_flowbox.add(button)
+        start = time.monotonic()
+        ids = self.parser.search_index.rank(search_text, SEARCH_MAX_RESULTS, self.frecency_bonus)
+        
+        # Los resultados reutilizan los botones de las categorías; solo se
+        # construyen los que el precargado aún no alcanzó: los primeros ya,
+        # el resto en tramos que se cancelan si llega otra consulta
+        missing = [i for i in ids if i not in self.entry_children]
+        for entry_id in missing[:SEARCH_TOP_RESULTS]:
+            self.build_search_entry(entry_id)
+        
+        self.apply_search_order(ids)
+        self.search_matches = set(ids)
+        self.search_ids = ids
+        self.update_search_items()
+        self.set_apps_view("__search__")
+        
+        if len(missing) > SEARCH_TOP_RESULTS:
+            self.search_missing = missing[SEARCH_TOP_RESULTS:]
+            self.search_materialize_source = GLib.idle_add(self.materialize_search_step)
+        
+        cost = (time.monotonic() - start) * 1000
+        self.search_cost = 0.7 * self.search_cost + 0.3 * cost
+        if PROFILE:
+            print(f"⏱️ Search '{search_text}': {len(ids)} matches, {cost:.1f} ms, "
+                  f"{(time.monotonic() - pending_since) * 1000:.1f} ms since first key")
+        return False
+    
+    def build_search_entry(self, entry_id):
+        """Build only the category child of one matched entry; the idle prebuild fills in the rest"""
+        if entry_id in self.entry_children:
+            return
+        index = self.parser.search_index
+        self.entry_children[entry_id] = self.add_app_child(index.categories[entry_id],
+                                                           index.apps[entry_id], entry_id)
+    
+    def materialize_search_step(self):
+        """Build pending search results within a small time budget per slice"""
+        deadline = time.monotonic() + PREBUILD_SLICE_MS / 1000.0
+        while self.search_missing:
+            self.build_search_entry(self.search_missing.pop(0))
+            if self.search_missing and (Gtk.events_pending() or time.monotonic() >= deadline):
+                return True
         
-        self.apps_flowbox.show_all()
+        self.search_materialize_source = None
+        self.update_search_items()
+        if self.apps_navigator and self.visible_category == "__search__":
+            self.apps_navigator.set_items(self.category_children["__search__"])
+        return False
+    
+    def update_search_items(self):
+        """Search view children in display order: ranked apps, then provider results"""
+        self.category_children["__search__"] = (
+            [self.entry_children[i] for i in self.search_ids if i in self.entry_children]
+            + self.category_children.get("__search_extra__", []))
+    
+    def show_provider_results(self, batches):
+        """Add results from search providers (places, recent files, commands...)"""
+        if not self.apps_flowbox or self.visible_category != "__search__":
+            return
+        index = self.parser.search_index
+        seen = {index.app_ids[i] for i in self.search_ids}
+        for provider, results in batches:
+            for app_info in results:
+                # No repetir lo que ya aparece entre las apps del menú
+                app_id = app_identity(app_info)
+                if app_id in seen:
+                    continue
+                seen.add(app_id)
+                self.add_app_child("__search_extra__", app_info)
+        self.update_search_items()
+        if self.apps_navigator:
+            self.apps_navigator.set_items(self.category_children["__search__"])
+    
+    def cancel_search_materialize(self):
+        if self.search_materialize_source:
+            GLib.source_remove(self.search_materialize_source)
+            self.search_materialize_source = None
+        self.search_missing = []
 
     def on_apps_key_press(self, widget, event):
-        """Handles key presses (arrows, Enter) on the apps flowbox."""
+        """Handles key presses (arrows, Home/End, PageUp/PageDown, Enter) on the apps flowbox."""
         keyval = event.keyval
         
-        if keyval in [Gdk.KEY_Down, Gdk.KEY_Up, Gdk.KEY_Right, Gdk.KEY_Left]:
+        if keyval in [Gdk.KEY_Down, Gdk.KEY_Up, Gdk.KEY_Right, Gdk.KEY_Left,
+                      Gdk.KEY_Home, Gdk.KEY_End, Gdk.KEY_Page_Up, Gdk.KEY_Page_Down]:
             self.navigate_apps(keyval)
             return True
         elif keyval == Gdk.KEY_Return:
@@ -2800,51 +5074,9 @@ class ArcMenuLauncher(Gtk.Window):
         return False
 
     def navigate_apps(self, keyval):
-        """Navigate through applications with arrow keys."""
-        children = self.apps_flowbox.get_children()
-        if not children:
-            return
-
-        selected_children = self.apps_flowbox.get_selected_children()
-        if not selected_children:
-            current_index = -1
-        else:
-            current_index = children.index(selected_children[0])
-
-        new_index = -1
-        
-        # Determine the number of columns on the first row.
-        # This is a more robust way to get the column count.
-        cols = 1
-        if len(children) > 1:
-            y_pos_first_child = children[0].get_allocation().y
-            for i in range(1, len(children)):
-                if children[i].get_allocation().y == y_pos_first_child:
-                    cols += 1
-                else:
-                    break
-
-        if keyval == Gdk.KEY_Down:
-            if current_index >= 0:
-                new_index = current_index + cols
-        elif keyval == Gdk.KEY_Up:
-            if current_index >= 0:
-                new_index = current_index - cols
-        elif keyval == Gdk.KEY_Right:
-            if current_index >= 0:
-                new_index = current_index + 1
-            else:
-                new_index = 0
-        elif keyval == Gdk.KEY_Left:
-            if current_index > 0:
-                new_index = current_index - 1
-            else: # Go to the end if at the start
-                new_index = len(children) - 1
-
-        if 0 <= new_index < len(children):
-            self.apps_flowbox.unselect_all()
-            self.apps_flowbox.select_child(children[new_index])
-            children[new_index].grab_focus()
+        """Navigate through applications with the keyboard using the cached grid model."""
+        if self.apps_navigator:
+            self.apps_navigator.move(keyval)
 
     def launch_selected_app(self):
         """Lanza la aplicación seleccionada con el teclado."""
@@ -2897,156 +5129,93 @@ class ArcMenuLauncher(Gtk.Window):
         except Exception as e:
             print(f"Failed to launch browser: {e}")
     
-    def on_app_clicked(self, button, app_info):
+    def hide_for_launch(self):
+        """Unmap the menu right now, before spawning, so it never lingers over the app"""
+        self.launch_started = time.monotonic()
+        self.cancel_prefetch()
+        self.hide()
+        # hide() solo encola el unmap; flush lo manda al servidor ya
+        Gdk.Display.get_default().flush()
+    
+    def exit_after_launch(self, label):
+        """
+        Record launch-to-spawn time and end the process with os._exit: the
+        window is already unmapped, so destroying the widget tree is wasted work.
+        """
+        if self.launch_started is None:
+            return
+        elapsed = (time.monotonic() - self.launch_started) * 1000
+        record_launch_time(label, elapsed)
+        if PROFILE:
+            print(f"⏱️ Launch to spawn ({label}): {elapsed:.1f} ms")
+        if self.bus_used:
+            # Gio puede haber encolado una activación por D-Bus (abrir carpetas)
+            try:
+                Gio.bus_get_sync(Gio.BusType.SESSION, None).flush_sync(None)
+            except GLib.Error:
+                pass
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
+    
+    def run_launch_plan(self, plan):
+        """Execute a plan from launch_plan(): open a folder or spawn the command"""
+        if plan['directory']:
+            print(f"🗂️ DEBUG: Detectada ruta en comando, abriendo con sistema: {plan['directory']}")
+            self.bus_used = True
+            open_directory(plan['directory'])
+            return
+        command, argv = plan['command'], plan['argv']
+        if not command:
+            return
+        client = None
+        if plan['terminal']:
+            terminal = terminal_command(self.path_index)
+            if self.terminal_server.handles(terminal):
+                client = self.terminal_server.client_argv(argv or ['sh', '-c', command])
+            if not client:
+                command = f"{terminal} -e {command}"
+                argv = [terminal, '-e'] + argv if argv else None
+        elif argv and self.terminal_server.handles(argv[0]):
+            # Entradas del menú que abren urxvt: mismas opciones, vía el daemon
+            client = self.terminal_server.client_argv(argv[1:], execute=False)
+        if client:
+            argv = client
+            command = shlex.join(client)
+        print(f"▶️ Ejecutando comando: {command}")
+        spawn_command(command, argv=argv, cwd=plan['cwd'], path_index=self.path_index)
+    
+    def on_app_clicked(self, button, app_info, terminal=False):
         """Handle application launch - Fix para carpetas forzadas y gtk-launch"""
+        name = app_info.get('Name', 'Unknown')
         try:
-            GLib.timeout_add(50, lambda: Gtk.main_quit())
+            self.hide_for_launch()
             
             command = app_info.get('Exec', '')
-            name = app_info.get('Name', 'Unknown')
             
             if not command:
                 return
     
-            # --- CORRECCIÓN DINÁMICA DE CARPETAS ---
-            import re
-            path_match = re.search(r'(/[^\s\']+)', command)
-            if path_match:
-                potential_path = os.path.expanduser(path_match.group(1))
-                if os.path.isdir(potential_path):
-                    print(f"🗂️ DEBUG: Detectada ruta en comando, abriendo con sistema: {potential_path}")
-                    open_directory(potential_path)
-                    return
-            # ---------------------------------------
-    
-            # 🔧 FIX PARA GTK-LAUNCH
-            if command.startswith('gtk-launch '):
-                desktop_name = command.replace('gtk-launch ', '').strip()
-                
-                # Buscar el archivo .desktop en las rutas estándar
-                desktop_paths = [
-                    "/usr/share/applications/",
-                    "/usr/local/share/applications/",
-                    os.path.expanduser("~/.local/share/applications/")
-                ]
-                
-                for base_path in desktop_paths:
-                    desktop_file = os.path.join(base_path, desktop_name)
-                    if not desktop_file.endswith('.desktop'):
-                        desktop_file += '.desktop'
-                    
-                    if os.path.exists(desktop_file):
-                        # Extraer el comando Exec= del archivo .desktop
-                        try:
-                            with open(desktop_file, 'r') as f:
-                                for line in f:
-                                    if line.startswith('Exec='):
-                                        command = line.replace('Exec=', '').strip()
-                                        # Limpiar parámetros %f, %F, %u, etc.
-                                        command = re.sub(r'\s+%\w+', '', command)
-                                        break
-                        except Exception as e:
-                            print(f"❌ Error leyendo {desktop_file}: {e}")
-                        break
-            
-            # Limpiar el comando de parámetros .desktop
-            command = re.sub(r'\s+%\w+', '', command).strip()
-            
-            print(f"▶️ Ejecutando comando: {command}")
-            subprocess.Popen(command, 
-                            shell=True,
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            start_new_session=True)
-            
-        except Exception as e:
-            print(f"❌ Error lanzando {name}: {e}")       
-            
-    def launch_application(self, app_info):
-        """Función centralizada para lanzar cualquier aplicación"""
-        try:
-            GLib.timeout_add(50, lambda: Gtk.main_quit())
-            
-            command = app_info['Exec']
-            print(f"DEBUG: Comando original: {command}")
-            
-            # Caso 1: Si el comando está vacío
-            if not command or not command.strip():
-                print(f"ERROR: Comando vacío para {app_info['Name']}")
-                return
-            
-            # Limpiar parámetros de .desktop
-            import re
-            clean_command = re.sub(r'\s+%\w', '', command)
-            clean_command = clean_command.strip()
-            
-            print(f"DEBUG: Comando limpio: {clean_command}")
-            
-            # Dividir el comando
-            try:
-                cmd_parts = shlex.split(clean_command)
-            except ValueError:
-                cmd_parts = clean_command.split()
-            
-            if not cmd_parts:
-                print(f"ERROR: No se pudo dividir el comando")
-                return
-            
-            print(f"DEBUG: Partes del comando: {cmd_parts}")
-            
-            # Verificar si es un comando especial (gtk-launch, xdg-open, etc)
-            special_commands = ['gtk-launch', 'xdg-open', 'python', 'python3', 'sh', 'bash']
-            
-            # Si es un comando especial, mantenerlo completo
-            if cmd_parts[0] in special_commands:
-                print(f"DEBUG: Comando especial detectado: {cmd_parts[0]}")
-                # No buscar en PATH, ejecutar directamente
-                final_cmd = cmd_parts
-            else:
-                # Para comandos normales, verificar si existen
-                executable = cmd_parts[0]
-                
-                if os.path.isabs(executable):
-                    # Es ruta absoluta
-                    if not os.path.exists(executable):
-                        print(f"ERROR: Ejecutable no existe: {executable}")
-                        return
-                else:
-                    # Buscar en PATH
-                    found = False
-                    for path_dir in os.environ.get('PATH', '').split(':'):
-                        full_path = os.path.join(path_dir, executable)
-                        if os.path.exists(full_path) and os.access(full_path, os.X_OK):
-                            cmd_parts[0] = full_path
-                            found = True
-                            break
-                    
-                    if not found:
-                        print(f"DEBUG: '{executable}' no encontrado en PATH, intentando igual")
-                
-                final_cmd = cmd_parts
-            
-            print(f"DEBUG: Comando final: {final_cmd}")
-            
-            # Ejecutar
-            subprocess.Popen(final_cmd,
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.DEVNULL,
-                            start_new_session=True)
-            
-            print(f"✅ Aplicación lanzada: {app_info['Name']}")
+            # El plan se calculó al leer el menú; los favoritos y resultados
+            # extra de la búsqueda no lo traen y se planifican aquí
+            plan = app_info.get('Launch') or launch_plan(app_info, self.parser.desktop_entries)
+            if terminal and not plan['directory']:
+                plan = dict(plan, terminal=True)
+            self.run_launch_plan(plan)
+            # El historial escribe a disco: después del spawn, no entre el clic y él
+            self.launch_history.record(app_info)
             
         except Exception as e:
-            print(f"❌ Error: {e}")
-            import traceback
-            traceback.print_exc()                 
+            print(f"❌ Error lanzando {name}: {e}")
+        finally:
+            self.exit_after_launch(name)
             
     # Función que faltaba
     def on_config_clicked(self, button):
         """Lanza el script de configuración."""
         try:
             # Cerrar la ventana del menú inmediatamente
-            GLib.timeout_add(100, lambda: Gtk.main_quit())
+            self.hide_for_launch()
             
             # Lanzar el script de configuración
             config_script = "/usr/local/bin/pymenu-config.py"
@@ -3056,6 +5225,8 @@ class ArcMenuLauncher(Gtk.Window):
             print(f"Lanzando el configurador: {config_script}")
         except Exception as e:
             print(f"Error al lanzar el configurador: {e}")
+        finally:
+            self.exit_after_launch("pymenu-config")
 
     def on_shutdown_clicked(self, button):
             """Run shutdown command or path"""
@@ -3069,16 +5240,15 @@ class ArcMenuLauncher(Gtk.Window):
                     return
     
                 # Cerramos el menú
-                GLib.timeout_add(100, lambda: Gtk.main_quit())
-                subprocess.Popen(cmd, 
-                                 shell=True,
-                                 stdout=subprocess.DEVNULL,
-                                 stderr=subprocess.DEVNULL)
+                self.hide_for_launch()
+                spawn_command(cmd, path_index=self.path_index)
                                  
                 print(f"Ejecutando: {cmd}")
                 
             except Exception as e:
                 print(f"Error al ejecutar el comando de apagado: {e}")
+            finally:
+                self.exit_after_launch("shutdown")
             
     def create_desktop_shortcut(self, app_info):
         """Crear un acceso directo .desktop usando spacefm"""
@@ -3111,10 +5281,9 @@ class ArcMenuLauncher(Gtk.Window):
             main_command = cleaned_parts[0]
             if not os.path.isabs(main_command):
                 # Si no es ruta absoluta, buscar en PATH
-                command_path = subprocess.run(['which', main_command], 
-                                            capture_output=True, text=True)
-                if command_path.returncode == 0:
-                    main_command = command_path.stdout.strip()
+                command_path = self.path_index.which(main_command)
+                if command_path:
+                    main_command = command_path
                     cleaned_parts[0] = main_command
                 else:
                     raise Exception(f"Comando '{main_command}' no encontrado en el sistema")
@@ -3159,20 +5328,104 @@ class ArcMenuLauncher(Gtk.Window):
             print(f"Comando validado: {clean_exec}")
             
             # Opcional: mostrar notificación
-            try:
-                subprocess.run(['notify-send', 'Pymenu', f'Acceso creado para {app_info.get("Name")}'], 
-                              check=False)
-            except:
-                pass
+            self.notify(f'Acceso creado para {app_info.get("Name")}')
                 
         except Exception as e:
             print(f"Error creando acceso directo: {e}")
-            try:
-                subprocess.run(['notify-send', 'Pymenu', f'Error: {str(e)}'], check=False)
-            except:
-                pass        
+            self.notify(f'Error: {str(e)}')
+    
+    def notify(self, message):
+        """Desktop notification through notify-send, without blocking the menu"""
+        self.jobs.spawn('notify-send', ['notify-send', 'Pymenu', message], timeout=3)
             
+def benchmark_search(entries=5000):
+    """Microbenchmark: per-keystroke search latency on a synthetic jwmrc"""
+    import random
+    import tempfile
+    
+    rng = random.Random(42)
+    words = ['audio', 'video', 'editor', 'viewer', 'network', 'file', 'manager',
+             'terminal', 'browser', 'image', 'player', 'config', 'system', 'disk',
+             'text', 'music', 'mail', 'chat', 'office', 'game']
+    categories = ['Desktop', 'System', 'Setup', 'Utility', 'Filesystem', 'Graphic',
+                  'Document', 'Network', 'Internet', 'Multimedia', 'Fun']
+    
+    root = ET.Element('JWM')
+    menu = ET.SubElement(root, 'RootMenu')
+    submenus = [ET.SubElement(menu, 'Menu', label=c) for c in categories]
+    for i in range(entries):
+        name = ' '.join(rng.choice(words).capitalize() for _ in range(2)) + f' {i}'
+        program = ET.SubElement(rng.choice(submenus), 'Program', label=name,
+                                icon=f'app{i}.png', tooltip=' '.join(rng.sample(words, 5)))
+        program.text = f'/usr/bin/{name.split()[0].lower()}{i} --flag'
+    
+    with tempfile.NamedTemporaryFile('wb', suffix='.jwmrc', delete=False) as f:
+        ET.ElementTree(root).write(f)
+        path = f.name
+    try:
+        parser = JWMMenuParser(path)
+        start = time.monotonic()
+        parser.parse_jwm_menu()
+        print(f"Parse + index of {len(parser.search_index)} entries: "
+              f"{(time.monotonic() - start) * 1000:.1f} ms")
+    finally:
+        os.unlink(path)
+    
+    # Cada prefijo de la consulta simula una pulsación de tecla
+    queries = ['terminal', 'image viewer', 'mus', 'zzz', 'e', 'net 12', 'tvw', 'imgvw']
+    for label, search in [
+        ("Substring", parser.search_index.search_ids),
+        ("Fuzzy top-%d" % SEARCH_MAX_RESULTS,
+         lambda text: parser.search_index.rank(text, SEARCH_MAX_RESULTS)),
+    ]:
+        timings = []
+        for query in queries:
+            for n in range(1, len(query) + 1):
+                start = time.perf_counter()
+                hits = search(query[:n])
+                timings.append(((time.perf_counter() - start) * 1000, query[:n], len(hits)))
+        
+        timings.sort()
+        mean = sum(t[0] for t in timings) / len(timings)
+        worst = timings[-1]
+        print(f"{label}: {len(timings)} keystrokes  mean {mean:.2f} ms  "
+              f"p50 {timings[len(timings) // 2][0]:.2f} ms  "
+              f"max {worst[0]:.2f} ms ('{worst[1]}', {worst[2]} hits)  frame 16.7 ms")
+
+
+def benchmark_launch(runs=200):
+    """Microbenchmark: spawn-to-exit time of `true` via sh -c versus a direct spawn"""
+    path_index = PathIndex()
+    path_index.refresh()
+    for label, launch in [
+        ("Popen(shell=True)", lambda: subprocess.Popen('true', shell=True,
+                                                       stdout=subprocess.DEVNULL,
+                                                       stderr=subprocess.DEVNULL,
+                                                       start_new_session=True).pid),
+        ("spawn_command", lambda: spawn_command('true', path_index=path_index, reap=False)),
+    ]:
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            pid = launch()
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"{label:>18}: mean {sum(timings) / len(timings):.2f} ms, "
+              f"median {timings[len(timings) // 2]:.2f} ms, max {timings[-1]:.2f} ms")
+
+
 def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == '--bench-search':
+        benchmark_search(int(sys.argv[2]) if len(sys.argv) >= 3 else 5000)
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == '--bench-launch':
+        benchmark_launch(int(sys.argv[2]) if len(sys.argv) >= 3 else 200)
+        return
+    
     icon_size = None
     jwm_file = None
     x = None